@@ -0,0 +1,71 @@
+import argparse
+import json
+import tempfile
+import shutil
+
+from konfi import bench
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="konfi 导表性能基准")
+    arg_parser.add_argument("--table-dir", help="使用已有表格目录, 不生成合成表格")
+    arg_parser.add_argument("--tables", type=int, default=1, help="配置表数")
+    arg_parser.add_argument("--sheets", type=int, default=1, help="每个配置表的 sheet 数")
+    arg_parser.add_argument("--rows", type=int, default=10000, help="每个 sheet 的数据行数")
+    arg_parser.add_argument("--cols", type=int, default=12, help="每个 sheet 的数据列数")
+    arg_parser.add_argument("--kinds", nargs="+", default=list(bench.COLUMN_KINDS), choices=list(bench.COLUMN_KINDS), help="列类型, 按顺序循环分配")
+    arg_parser.add_argument("--keys", type=int, default=1, help="主键数")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--writers", nargs="+", default=["py", "json", "lua", "kbin"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--reader", default="stream")
+    arg_parser.add_argument("--workers", type=int, default=1)
+    arg_parser.add_argument("--compact", action="store_true")
+    arg_parser.add_argument("--out", default="bench.json", help="结果文件")
+    arg_parser.add_argument("--compare", help="与之前的结果文件对比")
+    args = arg_parser.parse_args()
+
+    options = { "reader": args.reader, "workers": args.workers, "compact": args.compact, "repeat": args.repeat }
+
+    spec = None
+    table_dir = args.table_dir
+    if table_dir is None:
+        spec = bench.BenchSpec(
+            tables = args.tables,
+            sheets = args.sheets,
+            rows = args.rows,
+            cols = args.cols,
+            kinds = args.kinds,
+            keys = args.keys,
+            seed = args.seed,
+        )
+        table_dir = tempfile.mkdtemp(prefix="konfi_tables_")
+        bench.generate(table_dir, spec)
+
+    try:
+        results = bench.run(
+            table_dir,
+            args.writers,
+            repeat = args.repeat,
+            reader = args.reader,
+            workers = args.workers,
+            compact = args.compact,
+        )
+    finally:
+        if spec:
+            shutil.rmtree(table_dir, ignore_errors=True)
+
+    data = bench.report(results, spec, options)
+    bench.save(args.out, data)
+    print(f"[konfi] 基准结果保存到 {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+
+        if bench.compare(old, data):
+            exit(1)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,59 @@
+import argparse
 
 from konfi import Exportor
 
 def main():
     table_dir = "./design"
     data_dir = "./data"
-    writer_ext = "py"
     enum_tables = { "枚举" }
-    
+
+    arg_parser = argparse.ArgumentParser(description="konfi 导表")
+    arg_parser.add_argument("--watch", action="store_true", help="持续监视表格目录, 保存后自动重新导出")
+    arg_parser.add_argument("--writer", default="py", help="写入器: py, json, lua, kbin")
+    arg_parser.add_argument("--indent", type=int, help="json: 缩进空格数")
+    arg_parser.add_argument("--json-compact", action="store_true", help="json: 紧凑输出, 不缩进不换行")
+    arg_parser.add_argument("--line-length", type=int, help="py: 数据行宽")
+    arg_parser.add_argument("--black", action="store_true", help="py: 再用 black 格式化数据, 需要安装 black")
+    arg_parser.add_argument("--lazy-import", action="store_true", help="py: 生成延迟导入的包, 访问 sheet 时才导入")
+    arg_parser.add_argument("--lua-compact", action="store_true", help="lua: 紧凑输出, 去掉缩进与换行")
+    arg_parser.add_argument("--row-array", action="store_true", help="lua: 数据表输出为行数组与主键索引")
+    arg_parser.add_argument("--string-table", action="store_true", help="json / lua: 字符串值输出为共享字符串表中的序号")
+    args = arg_parser.parse_args()
+
+    # 写入器选项, 只传入命令行指定的选项, 写入器不支持时报错
+    writer_options = {}
+    if args.indent is not None:
+        writer_options["indent"] = args.indent
+    if args.json_compact:
+        writer_options["indent"] = None
+    if args.line_length is not None:
+        writer_options["line_length"] = args.line_length
+    if args.black:
+        writer_options["use_black"] = True
+    if args.lazy_import:
+        writer_options["lazy_import"] = True
+    if args.lua_compact:
+        writer_options["compact"] = True
+    if args.row_array:
+        writer_options["row_array"] = True
+    if args.string_table:
+        writer_options["string_table"] = True
+
     exportor = Exportor(
-        table_dir = table_dir, 
-        data_dir = data_dir, 
-        writer_ext = writer_ext,
+        table_dir = table_dir,
+        data_dir = data_dir,
+        writer_ext = args.writer,
+        writer_options = writer_options,
         enum_tables = enum_tables,
         is_inc = False,
     )
-    
-    exportor.run()
+
+    if args.watch:
+        exportor.watch()
+    else:
+        exportor.run()
 
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,293 @@
+
+""" 导表性能基准
+    生成指定规模与形状的合成表格, 按写入器分阶段计时 Exportor.run, 结果保存为 json 以便跨提交比较
+
+    阶段:
+      gather  搜索表格文件
+      load    读取器解码行数据 (流式读取时与解析交替进行, 单独累计)
+      parse   解析与合并, 不含 load
+      write   转为中间表示并写入文件
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import openpyxl as xl
+
+from .exportors import Exportor
+from .hooks import ExportHook, LoadStats
+
+
+RESULT_VERSION = 1 # 结果文件格式版本
+
+BENCH_ENUM = "BenchEnum"
+
+# 列类型: (类型字符串, 占用列数)
+COLUMN_KINDS = {
+    "int":    ("int", 1),
+    "float":  ("float", 1),
+    "string": ("string", 1),
+    "bool":   ("bool", 1),
+    "enum":   (f"{BENCH_ENUM}?", 1),
+    "list":   ("list[int]", 1),
+    "dict":   (f"dict[{BENCH_ENUM}, int]", 1),
+    "list_m": ("list_m[int]", 3),
+    "dict_m": (f"dict_m[{BENCH_ENUM}, int]", 3),
+}
+
+
+@dataclass(slots=True)
+class BenchSpec:
+    """ 合成表格的规模与形状
+        cols     数据列数 (不含主键), 按 kinds 循环分配类型
+        keys     主键数, 大于 1 时除末个主键外按 group 行合并单元格
+        enums    枚举成员数
+    """
+    tables: int = 1
+    sheets: int = 1
+    rows: int = 1000
+    cols: int = 12
+    kinds: list[str] = field(default_factory=lambda: list(COLUMN_KINDS))
+    keys: int = 1
+    group: int = 4
+    enums: int = 16
+    seed: int = 0
+
+
+# ----------------------------- 生成表格 -----------------------------------
+
+def _enum_names(spec: BenchSpec) -> list[str]:
+    return [f"E{i}" for i in range(spec.enums)]
+
+def _write_enum_table(path: Path, spec: BenchSpec):
+    wb = xl.Workbook()
+    ws = wb.active
+    ws.title = "bench_enum"
+    ws.append(["!var", "enum_cls", "enum_cls_alias", "enum_name", "enum_alias", "enum_val"])
+    ws.append(["#", "枚举类", "枚举类别名", "枚举名", "枚举别名", "枚举值"])
+    for i, name in enumerate(_enum_names(spec)):
+        ws.append([None, BENCH_ENUM if i == 0 else None, "基准枚举" if i == 0 else None, name, f"枚举{i}", "auto"])
+
+    if spec.enums > 1: # 枚举类列合并单元格
+        ws.merge_cells(start_row=3, start_column=2, end_row=2 + spec.enums, end_column=2)
+        ws.merge_cells(start_row=3, start_column=3, end_row=2 + spec.enums, end_column=3)
+
+    wb.save(path)
+
+def _cell_value(kind: str, rnd: random.Random, names: list[str], width: int) -> list[Any]:
+    """ 生成一个变量的单元格值, 多列类型返回多个值
+    """
+    match kind:
+        case "int":
+            return [rnd.randint(-100000, 100000)]
+        case "float":
+            return [round(rnd.uniform(-1000, 1000), 3)]
+        case "string":
+            return [f"名称{rnd.randint(0, 99999)}"]
+        case "bool":
+            return [rnd.choice(("是", "否", "Y", "N"))]
+        case "enum":
+            return [rnd.choice(names) if rnd.random() < 0.9 else None]
+        case "list":
+            return [", ".join(str(rnd.randint(0, 999)) for _ in range(rnd.randint(1, 6)))]
+        case "dict":
+            keys = rnd.sample(names, min(len(names), rnd.randint(1, 4)))
+            return [", ".join(f"{k}: {rnd.randint(0, 999)}" for k in keys)]
+        case "list_m":
+            return [rnd.randint(0, 999) if rnd.random() < 0.8 else None for _ in range(width)]
+        case "dict_m":
+            return [rnd.randint(0, 999) for _ in range(width)]
+
+    raise ValueError(f"[konfi] 未知的基准列类型 {kind}")
+
+def _write_sheet(ws, spec: BenchSpec, rnd: random.Random, names: list[str], id_base: int):
+    # 列布局 [(var, kind, 列数)]
+    columns = [(f"k{i}" if i else "id", "int", 1) for i in range(spec.keys)]
+    for i in range(spec.cols):
+        kind = spec.kinds[i % len(spec.kinds)]
+        columns.append((f"c{i}_{kind}", kind, COLUMN_KINDS[kind][1]))
+
+    # 配置行, 多列变量合并表头
+    var_row, type_row, label_row, param_row = ["!var"], ["!type"], ["!label"], ["!param"]
+    merges = []
+    for n, (var, kind, width) in enumerate(columns):
+        c = len(var_row) + 1
+        var_row += [f"*{var}" if n < spec.keys else var] + [None] * (width - 1)
+        type_row += [COLUMN_KINDS[kind][0]] + [None] * (width - 1)
+        label_row += [var] + [None] * (width - 1)
+        param_row += [f"枚举{j % len(names)}" for j in range(width)] if kind == "dict_m" else [None] * width
+        if width > 1:
+            merges.append((c, c + width - 1))
+
+    for row in (var_row, type_row, label_row, param_row):
+        ws.append(row)
+
+    for start, end in merges:
+        for r in range(1, 4):
+            ws.merge_cells(start_row=r, start_column=start, end_row=r, end_column=end)
+
+    # 数据行, 多主键时外层主键按 group 行合并
+    first = 5
+    group = spec.group if spec.keys > 1 else 1
+    for r in range(spec.rows):
+        outer = id_base + r // group
+        keys = [outer] + [r % group] * (spec.keys - 1)
+        row = [None]
+        for n, (var, kind, width) in enumerate(columns):
+            if n < spec.keys:
+                row.append(keys[n] if n or r % group == 0 else None)
+            else:
+                row += _cell_value(kind, rnd, names, width)
+
+        ws.append(row)
+
+    if group > 1:
+        for start in range(0, spec.rows, group):
+            end = min(start + group, spec.rows) - 1
+            if end > start:
+                ws.merge_cells(start_row=first + start, start_column=2, end_row=first + end, end_column=2)
+
+def generate(table_dir: Path | str, spec: BenchSpec) -> Path:
+    """ 生成合成表格到 table_dir, 包含一个枚举表与 spec.tables 个配置表
+    """
+    table_dir = Path(table_dir)
+    table_dir.mkdir(parents=True, exist_ok=True)
+
+    rnd = random.Random(spec.seed)
+    names = _enum_names(spec)
+    _write_enum_table(table_dir / "枚举.xlsx", spec)
+
+    for t in range(spec.tables):
+        wb = xl.Workbook()
+        wb.remove(wb.active)
+        for s in range(spec.sheets):
+            ws = wb.create_sheet(f"bench{t}_{s}")
+            _write_sheet(ws, spec, rnd, names, (t * spec.sheets + s) * spec.rows + 1)
+
+        wb.save(table_dir / f"bench{t}.xlsx")
+
+    return table_dir
+
+
+# ----------------------------- 分阶段计时 -----------------------------------
+
+class _StageHook(ExportHook):
+    """ 收集阶段耗时, 串行解析时 parse 扣除 load, 多进程解析时 load 无法从并行耗时中扣除, 计入 parse
+    """
+
+    def __init__(self, workers: int):
+        self._workers = workers
+        self.timings = { "gather": 0.0, "load": 0.0, "parse": 0.0, "write": 0.0, "total": 0.0 }
+
+    def on_stage(self, stage: str, seconds: float):
+        self.timings[stage] += seconds
+        if stage == "parse" and self._workers <= 1:
+            self.timings["parse"] -= self.timings["load"]
+
+    def on_load(self, stats: LoadStats):
+        self.timings["load"] += stats.seconds
+
+    def on_finish(self, summary: dict):
+        self.timings["total"] = summary["total"]
+
+
+def _git_commit(path: Path) -> str | None:
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=path, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    return res.stdout.strip() or None
+
+def run(
+    table_dir: Path | str,
+    writers: list[str],
+    repeat: int=3,
+    enum_tables: set[str]=None,
+    quiet: bool=True,
+    **kwargs,
+) -> dict[str, dict]:
+    """ 按写入器各导出 repeat 次, 每个阶段取中位数
+        kwargs 传给 Exportor, 如 reader, workers, compact
+    """
+    results = {}
+    enum_tables = enum_tables or { "枚举" }
+    for writer_ext in writers:
+        samples = []
+        for _ in range(repeat):
+            data_dir = tempfile.mkdtemp(prefix="konfi_bench_")
+            try:
+                hook = _StageHook(kwargs.get("workers", 1))
+                exportor = Exportor(table_dir=str(table_dir), data_dir=data_dir, writer_ext=writer_ext, enum_tables=enum_tables, hooks=[hook], **kwargs)
+                with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                    exportor.run()
+
+                samples.append(hook.timings)
+
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+        results[writer_ext] = { stage: round(statistics.median(s[stage] for s in samples), 4) for stage in samples[0] }
+        print(f"[konfi] 基准 {writer_ext}: " + ", ".join(f"{stage} {val:.3f}s" for stage, val in results[writer_ext].items()))
+
+    return results
+
+def report(results: dict[str, dict], spec: BenchSpec | None, options: dict) -> dict:
+    """ 组装结果文件内容, 附带提交与环境信息
+    """
+    return {
+        "version": RESULT_VERSION,
+        "commit": _git_commit(Path(__file__).parent),
+        "time": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "spec": asdict(spec) if spec else None,
+        "options": options,
+        "results": results,
+    }
+
+def save(path: Path | str, data: dict):
+    with Path(path).open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+def compare(old: dict, new: dict, threshold: float=0.1) -> list[str]:
+    """ 比较两次结果, 打印各阶段耗时变化, 返回变慢超过 threshold 的 "写入器.阶段"
+    """
+    if old.get("spec") != new.get("spec") or old.get("options") != new.get("options"):
+        print("[konfi] 警告: 两次基准的表格规模或导出选项不同")
+
+    regressions = []
+    print(f"[konfi] 对比 {old.get('commit')} -> {new.get('commit')}")
+    for writer_ext, stages in new["results"].items():
+        old_stages = old["results"].get(writer_ext, None)
+        if not old_stages:
+            continue
+
+        for stage, val in stages.items():
+            old_val = old_stages.get(stage, None)
+            if not old_val:
+                continue
+
+            ratio = val / old_val - 1
+            flag = ""
+            if ratio > threshold and val - old_val > 0.01: # 忽略极短阶段的抖动
+                regressions.append(f"{writer_ext}.{stage}")
+                flag = " <- 变慢"
+
+            print(f"  {writer_ext:6} {stage:7} {old_val:8.3f}s -> {val:8.3f}s {ratio:+7.1%}{flag}")
+
+    return regressions
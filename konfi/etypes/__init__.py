@@ -1,9 +1,9 @@
-from .etype import EType
+from .etype import EType, ETypeSpec, ETypeConverter
 from .eint import EInt
 from .estring import EString
 from .ebool import EBool
 from .efloat import EFloat
-from .eenum import EEnum, EEnumVal, EnumPack
+from .eenum import EEnum, EEnumVal, EnumPack, EnumIndex, EnumRegistry
 from .edict import EDict, EDictM
 from .elist import EList, EListM
 from .eset import ESet, ESetM
\ No newline at end of file
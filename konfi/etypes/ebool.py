@@ -5,6 +5,8 @@ from .etype import EType
 class EBool(EType):
     """ 布尔
     """
+    __slots__ = ()
+    
     etype_tag = "bool"
     default = False
     
@@ -13,6 +15,25 @@ class EBool(EType):
 
         self._convert()
 
+    _values = { "否": False, "N": False, "0": False, "是": True, "Y": True, "1": True } # 单元格值 -> 布尔
+
+    @classmethod
+    def convert_column(cls, values: list[Any], nullable: bool) -> tuple[list[Any], list[int]]:
+        default = None if nullable else cls.default
+        lookup = cls._values
+        res = []
+        bad = []
+        for i, val in enumerate(values):
+            if val is None:
+                res.append(default)
+            elif type(val) is str and val in lookup:
+                res.append(lookup[val])
+            else:
+                res.append(None)
+                bad.append(i)
+        
+        return res, bad
+
     def _convert(self):
         if self.val is None:
             if self.nullable:
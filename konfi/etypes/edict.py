@@ -5,6 +5,8 @@ from .etype import EType
 class EDict(EType):
     """ 单格字典, 泛型类型
     """
+    __slots__ = ("etype_args", "sep1", "sep2")
+    
     etype_tag = "dict"
     default = {}
     
@@ -24,6 +26,25 @@ class EDict(EType):
 
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return { k.unbox(): v.unbox() for k, v in self.py_val.items() }
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        param = conv.args[0] if conv.args else None
+        obj.sep1 = param[0] if param else ":"
+        obj.sep2 = param[1] if param else ","
+        if py_val is not None:
+            key_conv, val_conv = conv.arg_convs()
+            obj.py_val = { key_conv.box(k): val_conv.box(v) for k, v in py_val.items() }
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
@@ -48,12 +69,15 @@ class EDict(EType):
             if val_tag in enum_data:
                 self.enums.add(val_tag)
             
+            key_conv = EType.compile(key_etype, enum_data)
+            val_conv = EType.compile(val_etype, enum_data)
+            
             self.py_val = {}
             for item in self.val.split(self.sep2):
                 item: list[str] = item.split(self.sep1)
                 
-                key = EType.create(key_etype, [item[0].strip() or None], enum_data)
-                val = EType.create(val_etype, [item[1].strip() or None], enum_data)
+                key = key_conv([item[0].strip() or None])
+                val = val_conv([item[1].strip() or None])
 
                 self.py_val[key] = val
 
@@ -70,8 +94,11 @@ class EDictM(EType):
     """ 多格字典, 泛型类型
         元素类型必须是单格的
     """
+    __slots__ = ("etype_args", "param")
+    
     etype_tag = "dict_m"
     single_cell = False
+    default = {}
 
     def __init__(
         self, 
@@ -85,16 +112,32 @@ class EDictM(EType):
 
         self.etype_args = etype_args
         self.param = param
-        self.default = {}
 
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return { k.unbox(): v.unbox() for k, v in self.py_val.items() }
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        obj.param = conv.args[0] if conv.args else None
+        if py_val is not None:
+            key_conv, val_conv = conv.arg_convs()
+            obj.py_val = { key_conv.box(k): val_conv.box(v) for k, v in py_val.items() }
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
                 self.py_val = None
             else:
-                self.py_val = self.default
+                self.py_val = self.__class__.default
 
             return
 
@@ -114,11 +157,14 @@ class EDictM(EType):
                 self.enums.add(val_tag)
             
             
+            key_conv = EType.compile(key_etype, enum_data)
+            val_conv = EType.compile(val_etype, enum_data)
+            
             self.py_val = {}
             if self.param: # key 固定
                 for i, k in enumerate(self.param):
-                    key = EType.create(key_etype, [k], enum_data)
-                    val = EType.create(val_etype, [self.val[i]], enum_data)
+                    key = key_conv([k])
+                    val = val_conv([self.val[i]])
                     self.py_val[key] = val
             
             else: # key 非固定
@@ -127,8 +173,8 @@ class EDictM(EType):
                     raise ValueError(f"dict 类型要求键值对偶数列输入")
                 
                 for item in [self.val[i:i+2] for i in range(0, val_len, 2)]:
-                    key = EType.create(key_etype, [item[0]], enum_data)
-                    val = EType.create(val_etype, [item[1]], enum_data)
+                    key = key_conv([item[0]])
+                    val = val_conv([item[1]])
                     self.py_val[key] = val
 
         except ValueError:
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import count
+from typing import Any
 from .etype import EType
 
 @dataclass(slots=True)
@@ -13,20 +15,66 @@ class EnumPack:
 class EEnumVal(EType):
     """ 枚举值
     """
+    __slots__ = ("eenum", "enum_val")
+    
     etype_tag = "enumval"
     
-    def __init__(self, val: str, nullable, eenum: EEnum):
+    def __init__(self, val: str, nullable, eenum: EEnum, lookup: dict[str, EnumPack]=None):
         super().__init__(val, nullable)
         
         self.eenum = eenum
         self.enum_val = None
         
-        self._convert()
+        self._convert(lookup)
         
     def __repr__(self):
         return self.py_val if self.py_val else repr(self.py_val)
+    
+    def unbox(self):
+        # 只保留枚举名
+        if self.enum_val is None:
+            return None
         
-    def _convert(self):
+        return self.py_val[len(self.eenum.enum_cls) + 1:]
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        # 整列转换的枚举列在写入时逐个还原, 不经过父类直接设置属性
+        eenum: EEnum = conv.args[0]
+        obj = cls.__new__(cls)
+        obj.nullable = conv.nullable
+        obj.refs = None
+        obj.eenum = eenum
+        if py_val is None:
+            obj.val = obj.py_val = obj.enum_val = obj.enums = None
+        else:
+            obj.val = py_val
+            obj.py_val = f"{eenum.enum_cls}.{py_val}"
+            obj.enum_val = eenum.enum_dict_name[py_val].val
+            obj.enums = { eenum.enum_cls }
+        
+        return obj
+    
+    @classmethod
+    def convert_column(cls, values: list[Any], nullable: bool, eenum: EEnum, lookup: dict[str, EnumPack]=None) -> tuple[list[Any], list[int]]:
+        """ 整列转换为枚举名 (紧凑存储值), 每个单元格查找一次名字 / 别名合并的查找表
+        """
+        get = (lookup if lookup is not None else EnumIndex.compile(eenum)).get
+        res = []
+        bad = []
+        for i, val in enumerate(values):
+            pack = get(val, None) if val is not None else None
+            if pack is not None:
+                res.append(pack.name)
+                continue
+            
+            res.append(None)
+            if val is not None or not nullable:
+                bad.append(i)
+        
+        return res, bad
+        
+    def _convert(self, lookup: dict[str, EnumPack]=None):
         if self.val is None:
             if self.nullable:
                 self.py_val = None
@@ -35,22 +83,23 @@ class EEnumVal(EType):
             
             return
 
-        if pack := self.eenum.enum_dict_name.get(self.val, None):
-            self.py_val = f"{self.eenum.enum_cls}.{self.val}"
-            self.enum_val = pack.val
-
-        elif pack := self.eenum.enum_dict_alias.get(self.val, None):
-            self.py_val = f"{self.eenum.enum_cls}.{pack.name}"
-            self.enum_val = pack.val
-            
+        if lookup is not None: # 转换器绑定的查找表, 名字与别名只需查找一次
+            pack = lookup.get(self.val, None)
         else:
+            pack = self.eenum.enum_dict_name.get(self.val, None) or self.eenum.enum_dict_alias.get(self.val, None)
+        
+        if pack is None:
             raise ValueError(f"无法将值 {self.val} 转换为 {type(self).__name__}") from None
-    
+        
+        self.py_val = f"{self.eenum.enum_cls}.{pack.name}"
+        self.enum_val = pack.val
         self.enums = { self.eenum.enum_cls }
 
 class EEnum(EType):
     """ 枚举
     """
+    __slots__ = ("enum_cls", "enum_cls_alias", "enum_dict_name", "enum_dict_alias")
+    
     etype_tag = "enum"
     
 
@@ -100,3 +149,82 @@ class EEnum(EType):
             raise ValueError(f"无法将值 {self.val} 转换为 {type(self).__name__}") from None
 
 
+
+class EnumIndex:
+    """ 由枚举注册表编译的查找结构, 编译后只读
+        lookups: { enum_cls: { 枚举名 / 别名: EnumPack } }, 枚举名优先于别名
+    """
+    __slots__ = ("version", "lookups")
+    
+    def __init__(self, enum_data: dict[str, EEnum], version: int=None):
+        self.version = version
+        self.lookups: dict[str, dict[str, EnumPack]] = { enum_cls: self.compile(eenum) for enum_cls, eenum in enum_data.items() }
+    
+    @staticmethod
+    def compile(eenum: EEnum) -> dict[str, EnumPack]:
+        return { **eenum.enum_dict_alias, **eenum.enum_dict_name }
+
+
+class EnumRegistry(dict):
+    """ 枚举注册表 { enum_cls: EEnum }
+        内容变化时 version 更新为全局唯一的新值, 用作类型描述缓存的失效标记
+    """
+    __slots__ = ("version", "_index")
+    
+    _versions = count(1)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(EnumRegistry._versions)
+        self._index: EnumIndex = None
+    
+    @property
+    def index(self) -> EnumIndex:
+        """ 当前版本编译的查找结构, 注册表变化后重新编译
+        """
+        if self._index is None or self._index.version != self.version:
+            self._index = EnumIndex(self, self.version)
+        
+        return self._index
+    
+    def __reduce__(self):
+        # 反序列化 (如发送到子进程) 后重新分配版本
+        return (type(self), (dict(self),))
+    
+    def _touch(self):
+        self.version = next(EnumRegistry._versions)
+    
+    def __setitem__(self, key, val):
+        super().__setitem__(key, val)
+        self._touch()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch()
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._touch()
+    
+    def setdefault(self, key, default=None):
+        val = super().setdefault(key, default)
+        self._touch()
+        return val
+    
+    def pop(self, *args):
+        val = super().pop(*args)
+        self._touch()
+        return val
+    
+    def popitem(self):
+        item = super().popitem()
+        self._touch()
+        return item
+    
+    def clear(self):
+        super().clear()
+        self._touch()
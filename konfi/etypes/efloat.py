@@ -2,9 +2,16 @@
 from typing import Any
 from .etype import EType
 
+try:
+    import numpy as np
+except ImportError: # 可选依赖, 未安装时使用纯 Python 实现
+    np = None
+
 class EFloat(EType):
     """ 浮点数
     """
+    __slots__ = ()
+    
     etype_tag = "float"
     default = 0.0
 
@@ -13,6 +20,38 @@ class EFloat(EType):
 
         self._convert()
 
+    @classmethod
+    def convert_column(cls, values: list[Any], nullable: bool) -> tuple[list[Any], list[int]]:
+        """ 批量转换, 安装 NumPy 时整列一次转换, 失败时逐个转换以定位出错单元格
+        """
+        default = None if nullable else cls.default
+        if np is not None and values:
+            try:
+                res = np.asarray(values, dtype=np.float64).tolist() # None 转为 nan, 之后替换为默认值
+            except (ValueError, TypeError, OverflowError):
+                pass
+            else:
+                for i, val in enumerate(values):
+                    if val is None:
+                        res[i] = default
+                return res, []
+        
+        res = []
+        bad = []
+        for i, val in enumerate(values):
+            if type(val) is float:
+                res.append(val)
+            elif val is None:
+                res.append(default)
+            else:
+                try:
+                    res.append(float(val))
+                except (ValueError, TypeError, OverflowError):
+                    res.append(None)
+                    bad.append(i)
+        
+        return res, bad
+
     def _convert(self):
         if self.val is None:
             if self.nullable:
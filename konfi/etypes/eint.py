@@ -2,9 +2,16 @@
 from typing import Any
 from .etype import EType
 
+try:
+    import numpy as np
+except ImportError: # 可选依赖, 未安装时使用纯 Python 实现
+    np = None
+
 class EInt(EType):
     """ 整数
     """
+    __slots__ = ()
+    
     etype_tag = "int"
     default = 0
 
@@ -13,6 +20,32 @@ class EInt(EType):
 
         self._convert()
 
+    @classmethod
+    def convert_column(cls, values: list[Any], nullable: bool) -> tuple[list[Any], list[int]]:
+        """ 批量转换, 已是整数的单元格不再转换, 全为有限浮点数时用 NumPy 截断
+        """
+        if np is not None and values and all(type(v) is float for v in values):
+            arr = np.asarray(values, dtype=np.float64)
+            if np.isfinite(arr).all() and (np.abs(arr) < 2 ** 63).all():
+                return arr.astype(np.int64).tolist(), []
+        
+        default = None if nullable else cls.default
+        res = []
+        bad = []
+        for i, val in enumerate(values):
+            if type(val) is int:
+                res.append(val)
+            elif val is None:
+                res.append(default)
+            else:
+                try:
+                    res.append(int(val))
+                except (ValueError, TypeError, OverflowError):
+                    res.append(None)
+                    bad.append(i)
+        
+        return res, bad
+
     def _convert(self):
         if self.val is None:
             if self.nullable:
@@ -6,6 +6,8 @@ class EList(EType):
     """ 单格列表, 泛型类型
         元素类型必须是单格的
     """
+    __slots__ = ("etype_args", "sep")
+    
     etype_tag = "list"
     default = []
 
@@ -25,6 +27,23 @@ class EList(EType):
 
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return list(v.unbox() for v in self.py_val)
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        obj.sep = conv.args[0][0] if conv.args and conv.args[0] else ","
+        if py_val is not None:
+            item_conv, = conv.arg_convs()
+            obj.py_val = list(item_conv.box(v) for v in py_val)
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
@@ -44,10 +63,11 @@ class EList(EType):
             if etype_tag in enum_data:
                 self.enums.add(etype_tag)            
             
+            conv = EType.compile(etype, enum_data)
             self.py_val = []
 
             for item in [s.strip() for s in self.val.split(self.sep)]:
-                val = EType.create(etype, [item or None], enum_data)
+                val = conv([item or None])
                 self.py_val.append(val)
 
         except ValueError:
@@ -58,6 +78,8 @@ class EList(EType):
 class EListM(EType):
     """ 多格列表, 泛型类型
     """
+    __slots__ = ("etype_args",)
+    
     etype_tag = "list_m"
     single_cell = False
     default = []
@@ -75,6 +97,22 @@ class EListM(EType):
         
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return list(v.unbox() for v in self.py_val)
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        if py_val is not None:
+            item_conv, = conv.arg_convs()
+            obj.py_val = list(item_conv.box(v) for v in py_val)
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
@@ -94,9 +132,10 @@ class EListM(EType):
             if etype_tag in enum_data:
                 self.enums.add(etype_tag)
             
+            conv = EType.compile(etype, enum_data)
             self.py_val = []
             for item in self.val:
-                val = EType.create(etype, [item], enum_data)
+                val = conv([item])
                 self.py_val.append(val)
 
         except ValueError:
@@ -6,6 +6,8 @@ class ESet(EType):
     """ 单格集合, 泛型类型
         元素类型必须是单格的
     """
+    __slots__ = ("etype_args", "sep")
+    
     etype_tag = "set"
     default = set()
 
@@ -25,6 +27,23 @@ class ESet(EType):
 
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return set(v.unbox() for v in self.py_val)
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        obj.sep = conv.args[0][0] if conv.args and conv.args[0] else ","
+        if py_val is not None:
+            item_conv, = conv.arg_convs()
+            obj.py_val = set(item_conv.box(v) for v in py_val)
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
@@ -44,10 +63,11 @@ class ESet(EType):
             if etype_tag in enum_data:
                 self.enums.add(etype_tag)
             
+            conv = EType.compile(etype, enum_data)
             self.py_val = set()
 
             for item in [s.strip() for s in self.val.split(self.sep)]:
-                val = EType.create(etype, [item or None], enum_data)
+                val = conv([item or None])
                 self.py_val.add(val)
 
         except ValueError:
@@ -58,6 +78,8 @@ class ESet(EType):
 class ESetM(EType):
     """ 多格集合, 泛型类型
     """
+    __slots__ = ("etype_args",)
+    
     etype_tag = "set_m"
     single_cell = False
     default = set()
@@ -76,6 +98,22 @@ class ESetM(EType):
         
         self._convert(enum_data)
 
+    def unbox(self):
+        if self.py_val is None:
+            return None
+        
+        return set(v.unbox() for v in self.py_val)
+    
+    @classmethod
+    def box(cls, py_val, conv):
+        obj = super().box(py_val, conv)
+        obj.etype_args = conv.etype_args
+        if py_val is not None:
+            item_conv, = conv.arg_convs()
+            obj.py_val = set(item_conv.box(v) for v in py_val)
+        
+        return obj
+
     def _convert(self, enum_data):
         if self.val is None:
             if self.nullable:
@@ -95,9 +133,10 @@ class ESetM(EType):
             if etype_tag in enum_data:
                 self.enums.add(etype_tag)
             
+            conv = EType.compile(etype, enum_data)
             self.py_val = set()
             for item in self.val:
-                val = EType.create(etype, [item], enum_data)
+                val = conv([item])
                 self.py_val.add(val)
 
         except ValueError:
@@ -1,14 +1,21 @@
 
 from typing import Any
+import sys
+
 from .etype import EType
 
 class EString(EType):
     """ 字符串
     """
+    __slots__ = ()
+    
     etype_tag = "string"
     default = ""
 
     def __init__(self, val: Any, nullable: bool=False):
+        if type(val) is str: # 驻留字符串, 各行各表中相同的文本共用一个对象
+            val = sys.intern(val)
+        
         super().__init__(val, nullable)
 
         self._convert()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 from typing import Any
+from dataclasses import dataclass
+from collections import OrderedDict
 
 import re
 
@@ -28,6 +30,14 @@ class EType(metaclass=ETypeMeta):
     _reg_etypes_cls: dict[str, type[EType]] = {}
     _etype_args_re = re.compile(r'\[([^\[\]]*)\]$')
     
+    # 类型描述缓存, key 为 (类型字符串, 枚举注册表版本), LRU 淘汰
+    _spec_cache: OrderedDict[tuple[str, int], ETypeSpec] = OrderedDict()
+    _spec_cache_size: int = 4096
+    _spec_cache_hits: int = 0
+    _spec_cache_misses: int = 0
+    
+    __slots__ = ("val", "nullable", "py_val", "enums", "refs")
+    
     etype_tag: str = None
     single_cell: bool = True # 标记是否为单格类型
     default = None
@@ -54,31 +64,52 @@ class EType(metaclass=ETypeMeta):
         """
         raise NotImplementedError("子类必须实现 _convert 方法")
     
-    
     @classmethod
-    def create(
-        cls, 
-        etype: str, 
-        data_list: list[Any], 
-        enum_data: dict[str, EType], 
-        *args, 
-        **wargs,
-    ) -> EType:
-        """ 创建类型实例
-            有两种分类: 
-            1. 泛型 / 非泛型, 泛型需要有额外的类型参数 etype_args
-            2. 单格 / 多格, 多格时 val 为提取自多格组成的列表
+    def convert_column(cls, values: list[Any], nullable: bool) -> tuple[list[Any], list[int]]:
+        """ 批量转换一列单元格, 返回 (原生值, 无法转换的下标)
+            默认逐个创建实例, 标量类型可重写为批量实现
         """
-        if cls is not EType:
-            raise TypeError(f"{cls.__name__} 不能调用 create")
+        res = []
+        bad = []
+        for i, val in enumerate(values):
+            try:
+                res.append(cls(val, nullable).py_val)
+            except (ValueError, TypeError, OverflowError):
+                res.append(None)
+                bad.append(i)
         
+        return res, bad
+    
+    def unbox(self) -> Any:
+        """ 紧凑存储值, 只保留转换后的原生值, 类型由列保存
+        """
+        return self.py_val
+    
+    @classmethod
+    def box(cls, py_val: Any, conv: ETypeConverter) -> EType:
+        """ 由紧凑存储值还原类型实例, 不再重复转换
+        """
+        obj = cls.__new__(cls)
+        obj.val = py_val
+        obj.nullable = conv.nullable
+        obj.py_val = py_val
+        obj.enums = None
+        obj.refs = None
+        return obj
+    
+    
+    @classmethod
+    def _resolve(cls, etype: str, enum_data: dict[str, EType]) -> ETypeSpec:
+        """ 解析类型字符串
+        """
         nullable = etype.endswith("?")
         if nullable:
             etype = etype[:-1]
         
-        if eenum := enum_data.get(etype, None): # 枚举类型
+        if eenum := enum_data.get(etype, None): # 枚举类型, 绑定注册表编译好的查找表
             etype_cls = cls._reg_etypes_cls.get("enumval", None)
-            return etype_cls(data_list[0], nullable, eenum)
+            index = getattr(enum_data, "index", None)
+            return ETypeSpec(etype_cls, nullable, None, eenum, index.lookups[etype] if index is not None else None)
         
         
         idx = etype.find("[")
@@ -92,14 +123,154 @@ class EType(metaclass=ETypeMeta):
 
         # etype_args, 泛型额外类型参数
         if m := cls._etype_args_re.match(etype[idx:]):
-            etype_args = [p.strip() for p in m.group(1).split(",")]
+            etype_args = tuple(p.strip() for p in m.group(1).split(","))
         else:
             etype_args = None
         
+        return ETypeSpec(etype_cls, nullable, etype_args)
+
+    @classmethod
+    def resolve(cls, etype: str, enum_data: dict[str, EType]) -> ETypeSpec:
+        """ 获取类型描述, 带缓存
+            enum_data 为 EnumRegistry 时按其版本缓存, 注册表变化后旧结果自动失效
+        """
+        if cls is not EType:
+            raise TypeError(f"{cls.__name__} 不能调用 resolve")
+        
+        version = getattr(enum_data, "version", None)
+        if version is None: # 普通 dict 无法感知变化, 不缓存
+            return cls._resolve(etype, enum_data)
+        
+        key = (etype, version)
+        cache = EType._spec_cache
+        if (spec := cache.get(key, None)) is not None:
+            cache.move_to_end(key)
+            EType._spec_cache_hits += 1
+            return spec
+        
+        EType._spec_cache_misses += 1
+        spec = cls._resolve(etype, enum_data)
+        cache[key] = spec
+        if len(cache) > EType._spec_cache_size:
+            cache.popitem(last=False)
+        
+        return spec
+
+    @classmethod
+    def cache_info(cls) -> dict[str, int]:
+        """ 类型描述缓存统计
+        """
+        return {
+            "hits"   : EType._spec_cache_hits,
+            "misses" : EType._spec_cache_misses,
+            "size"   : len(EType._spec_cache),
+            "maxsize": EType._spec_cache_size,
+        }
+
+    @classmethod
+    def cache_clear(cls):
+        """ 清空类型描述缓存与统计
+        """
+        EType._spec_cache.clear()
+        EType._spec_cache_hits = 0
+        EType._spec_cache_misses = 0
+
+    @classmethod
+    def compile(
+        cls, 
+        etype: str, 
+        enum_data: dict[str, EType], 
+        *args, 
+        **wargs,
+    ) -> ETypeConverter:
+        """ 预解析类型字符串, 返回可重复调用的转换器
+            类型字符串只解析一次, 之后每个单元格只需调用转换器
+        """
+        if cls is not EType:
+            raise TypeError(f"{cls.__name__} 不能调用 compile")
+        
+        spec = cls.resolve(etype, enum_data)
+        if spec.eenum is not None: # 枚举类型
+            return ETypeConverter(spec, enum_data, (spec.eenum, spec.enum_lookup), {})
+        
+        return ETypeConverter(spec, enum_data, args, wargs)
+    
+    @classmethod
+    def create(
+        cls, 
+        etype: str, 
+        data_list: list[Any], 
+        enum_data: dict[str, EType], 
+        *args, 
+        **wargs,
+    ) -> EType:
+        """ 创建类型实例
+            有两种分类: 
+            1. 泛型 / 非泛型, 泛型需要有额外的类型参数 etype_args
+            2. 单格 / 多格, 多格时 val 为提取自多格组成的列表
+        """
+        if cls is not EType:
+            raise TypeError(f"{cls.__name__} 不能调用 create")
+        
+        return cls.compile(etype, enum_data, *args, **wargs)(data_list)
+
+
+
+@dataclass(slots=True, frozen=True)
+class ETypeSpec:
+    """ 解析后的类型描述
+    """
+    etype_cls : type[EType]
+    nullable  : bool
+    etype_args: tuple[str, ...] = None # 泛型参数
+    eenum     : EType = None # 枚举类型
+    enum_lookup: dict = None # 枚举名 / 别名查找表
+
+
+class ETypeConverter:
+    """ 类型转换器, 由 EType.compile 创建
+        持有解析好的类型类, 可空标记, 泛型参数 与 额外参数
+    """
+    __slots__ = ("etype_cls", "nullable", "etype_args", "enum_data", "args", "wargs", "single_cell", "_arg_convs")
+    
+    def __init__(
+        self, 
+        spec: ETypeSpec, 
+        enum_data: dict[str, EType], 
+        args: tuple, 
+        wargs: dict,
+    ):
+        self.etype_cls = spec.etype_cls
+        self.nullable = spec.nullable
+        self.etype_args = spec.etype_args
+        self.enum_data = enum_data
+        self.args = args
+        self.wargs = wargs
+        self.single_cell = spec.etype_cls.single_cell
+        self._arg_convs: tuple[ETypeConverter, ...] = None # 泛型参数的转换器, 首次使用时编译
+    
+    def arg_convs(self) -> tuple[ETypeConverter, ...]:
+        """ 泛型参数的转换器, 容器类型还原元素时使用
+        """
+        if self._arg_convs is None:
+            self._arg_convs = tuple(EType.compile(arg, self.enum_data) for arg in self.etype_args)
+        
+        return self._arg_convs
+    
+    def box(self, py_val: Any) -> EType:
+        """ 由紧凑存储值还原类型实例
+        """
+        return self.etype_cls.box(py_val, self)
+    
+    def convert_column(self, values: list[Any]) -> tuple[list[Any], list[int]]:
+        """ 批量转换一列单元格值, 返回 (原生值, 无法转换的下标)
+        """
+        return self.etype_cls.convert_column(values, self.nullable, *self.args, **self.wargs)
+    
+    def __call__(self, data_list: list[Any]) -> EType:
         # 创建类型实例
-        val = data_list[0] if etype_cls.single_cell else data_list
-        if etype_args is None: # 非泛型
-            return etype_cls(val, nullable, *args, **wargs)
+        val = data_list[0] if self.single_cell else data_list
+        if self.etype_args is None: # 非泛型
+            return self.etype_cls(val, self.nullable, *self.args, **self.wargs)
         else: # 泛型
-            return etype_cls(val, nullable, enum_data, etype_args, *args, **wargs)
-        
+            return self.etype_cls(val, self.nullable, self.enum_data, self.etype_args, *self.args, **self.wargs)
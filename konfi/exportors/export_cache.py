@@ -0,0 +1,163 @@
+
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import pickle
+import hashlib
+
+
+class DepGraph:
+    """ sheet 依赖图, 由各 sheet 的 _info["enums"] 与 _info["refs"] 构建
+    """
+
+    def __init__(self):
+        self._dependents: dict[tuple[str, str], set[str]] = {} # { ("enum" | "sheet", 名称): { 依赖它的 sheet } }
+
+    def add_sheet(self, sheet_name: str, info: dict):
+        for enum_cls in info.get("enums", None) or ():
+            self._dependents.setdefault(("enum", enum_cls), set()).add(sheet_name)
+
+        for ref in info.get("refs", None) or ():
+            self._dependents.setdefault(("sheet", ref), set()).add(sheet_name)
+
+    def dependents(self, enums: set[str], sheets: set[str]) -> set[str]:
+        """ 获取依赖变化枚举或 sheet 的所有 sheet, 包含间接依赖
+        """
+        res = set()
+        todo = [("enum", e) for e in enums] + [("sheet", s) for s in sheets]
+        while todo:
+            for sheet_name in self._dependents.get(todo.pop(), ()):
+                if sheet_name not in res and sheet_name not in sheets:
+                    res.add(sheet_name)
+                    todo.append(("sheet", sheet_name))
+
+        return res
+
+
+class ExportCache:
+    """ 增量导出缓存
+        data/.konfi/
+          |- manifest.json  表格文件指纹 (mtime, size, md5), 枚举指纹 与缓存信息
+          |- sheets/        各表格解析结果 [(sheet 名, 解析器名, 数据)]
+    """
+    version = 3 # 缓存格式版本, 解析结果结构变化时递增
+
+    def __init__(self, cache_path: Path, tag: str=""):
+        self._cache_path = cache_path
+        self._sheets_path = cache_path / "sheets"
+        self._manifest_path = cache_path / "manifest.json"
+        self._tag = tag # 影响解析结果的导出选项
+
+        self._tables: dict[str, dict] = {} # { 表格路径: { "mtime_ns", "size", "md5" } }
+        self._enums: dict[str, str] = {} # { 枚举类: 内容 md5 }
+        self._fingerprints: dict[str, dict] = {} # 本次检查得到的指纹
+        self._pending: dict[str, bytes] = {} # 待保存的解析结果
+
+        self._load_manifest()
+
+    def _load_manifest(self):
+        if not self._manifest_path.is_file():
+            return
+
+        with self._manifest_path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != self.version or manifest.get("tag") != self._tag:
+            print("[konfi] 增量缓存版本或导出选项变化, 缓存失效")
+            return
+
+        self._tables = manifest.get("tables", {})
+        self._enums = manifest.get("enums", {})
+
+    def _calc_file_md5(self, path: Path) -> str:
+        md5 = hashlib.md5()
+        with path.open("rb") as f:
+            while chunk := f.read(1 << 20):
+                md5.update(chunk)
+
+        return md5.hexdigest()
+
+    def _is_fresh(self, path: Path, entries: dict[str, dict]) -> bool:
+        """ 检查文件是否未变化, 并记录本次指纹
+            mtime 与 size 一致时直接认为未变化, 否则比较文件内容 md5
+        """
+        key = path.as_posix()
+        stat = path.stat()
+        entry = entries.get(key, None)
+
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self._fingerprints[key] = entry
+            return True
+
+        md5 = self._calc_file_md5(path)
+        self._fingerprints[key] = { "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "md5": md5 }
+        return bool(entry) and entry["md5"] == md5
+
+    def _sheet_file(self, path: Path) -> Path:
+        name = hashlib.md5(path.as_posix().encode("utf-8")).hexdigest()
+        return self._sheets_path / f"{name}.pkl"
+
+    # --------------------------------------------------------------------------------
+
+    def check_enums(self, enum_data: dict) -> set[str]:
+        """ 检查枚举类型, 返回内容变化 (含新增与删除) 的枚举类
+        """
+        enums = { enum_cls: hashlib.md5(repr(eenum).encode("utf-8")).hexdigest() for enum_cls, eenum in enum_data.items() }
+        changed = { enum_cls for enum_cls in enums.keys() | self._enums.keys() if enums.get(enum_cls) != self._enums.get(enum_cls) }
+        self._enums = enums
+
+        return changed
+
+    def load(self, path: Path) -> list[tuple[str, str, dict]] | None:
+        """ 读取未变化表格的缓存解析结果, 表格变化或无缓存时返回 None
+        """
+        if not self._is_fresh(path, self._tables):
+            return None
+
+        sheet_file = self._sheet_file(path)
+        if not sheet_file.is_file():
+            return None
+
+        with sheet_file.open("rb") as f:
+            return pickle.load(f)
+
+    def store(self, path: Path, parsed: list[tuple[str, str, dict]]):
+        """ 记录表格的解析结果, save 时写入
+            需在合并与写入前调用, 之后数据会被修改
+        """
+        self._pending[path.as_posix()] = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, table_paths: list[Path]):
+        """ 保存 manifest 与新的解析结果, 不在 table_paths 中的表格缓存被清理
+        """
+        self._sheets_path.mkdir(parents=True, exist_ok=True)
+
+        tables = {}
+        for path in table_paths:
+            key = path.as_posix()
+            if key in self._pending:
+                with self._sheet_file(path).open("wb") as f:
+                    f.write(self._pending[key])
+
+            elif key not in self._tables:
+                continue
+
+            tables[key] = self._fingerprints.get(key, None) or self._tables[key]
+
+        sheet_files = { self._sheet_file(p) for p in table_paths }
+        for sheet_file in self._sheets_path.glob("*.pkl"): # 清理已删除表格的缓存
+            if sheet_file not in sheet_files:
+                sheet_file.unlink()
+
+        self._tables = tables
+        self._pending = {}
+
+        manifest = {
+            "version": self.version,
+            "tag": self._tag,
+            "enums": self._enums,
+            "tables": self._tables,
+        }
+        with self._manifest_path.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
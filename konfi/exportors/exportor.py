@@ -1,16 +1,19 @@
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+import fnmatch
+import time
 
-import openpyxl as xl
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.workbook.workbook import Workbook
-
-import json
-import hashlib
 
 from ..parsers import *
 from ..writers import *
-from ..etypes import EEnum
+from ..readers import *
+from ..etypes import EType, EEnum, EnumRegistry
+from ..hooks import ExportHook, ExportProfiler, LoadStats, SheetStats, WriteStats, TimedReader, peak_memory
+from .export_cache import ExportCache, DepGraph
+from .watcher import ExportWatcher
 
 
 class Exportor:
@@ -24,12 +27,25 @@ class Exportor:
         writer_ext: str="py",
         enum_tables: set[str]=None,
         is_inc=False,
+        reader: str="stream",
+        workers: int=1,
+        compact: bool=False,
+        hooks: list[ExportHook]=None,
+        profile: bool=False,
+        include: list[str]=None,
+        exclude: list[str]=None,
+        targets: list[tuple[str | Writer, str] | tuple[str, str, dict[str, Any]]]=None,
+        writer_options: dict[str, Any]=None,
     ) -> None:
         
         self._table_dir = table_dir # 表格文件目录
-        self._data_dir = data_dir # 导出配置数据目录
+        self._data_dir = data_dir # 导出配置数据目录, 也存放增量缓存与性能报告
         self._enum_tables = enum_tables # 枚举表集合
         self._is_inc = is_inc # 增量导表
+        self._workers = workers # 并行解析配置表的进程数, 1 为串行
+        self._compact = compact # 紧凑存储, 行数据只保留原生值, 写入时再按列类型还原
+        self._include = list(include or []) # 只导出匹配的配置表 sheet, fnmatch 模式, 为空时导出全部
+        self._exclude = list(exclude or []) # 不导出匹配的配置表 sheet
 
         self._enum_table_paths: list[Path] = []
         self._config_table_paths: list[Path] = []
@@ -38,14 +54,64 @@ class Exportor:
         self._matchers: list[Parser] = []
         self._filters: list[Parser] = []
         self._default_parser: Parser = Parser.get_parser("CommonParser")
-        self._writer: Writer = Writer.get_writer(writer_ext)
+        # 导出目标 [(写入器, 导出目录)], 所有目标共用一次解析结果
+        # targets 的每一项为 (扩展名, 导出目录[, 写入器选项]) 或 (写入器, 导出目录), 未指定时按 writer_ext 与 writer_options 导出到 data_dir
+        self._targets: list[tuple[Writer, Path]] = [
+            self._make_target(*target) for target in (targets or [(writer_ext, data_dir, writer_options)])
+        ]
+        self._reader: Reader = Reader.get_reader(reader) # stream: 流式只读加载, openpyxl: 完整加载, xlsx: 轻量解析压缩包
         
         self._export_data: dict[str, dict] = {} # 导出数据
-        self._enum_data: dict[str, EEnum] = {} # 枚举类型
-        self._md5: dict[str, str] = {}
+        self._enum_data: dict[str, EEnum] = EnumRegistry() # 枚举类型
+        self._cache: ExportCache = None # 增量导出缓存
+        self._cache_stats: dict[str, int] = { "cached": 0, "parsed": 0 } # 增量导表 来自缓存 / 重新解析的 sheet 数
+        self._enum_sheets: set[str] = set() # 枚举表中的 sheet
+        self._table_sheets: dict[Path, list[str]] = {} # { 配置表: [sheet 名] }, 按解析顺序
+        self._sheet_deps: DepGraph = DepGraph() # 按合并前各表格的解析结果构建的依赖图
+        
+        # 性能回调, 设置后统计各阶段耗时, 读取器包装为计时读取器
+        self._hooks: list[ExportHook] = list(hooks or [])
+        self._profile = profile # 输出性能报告与统计信息
+        if profile:
+            self._hooks.append(ExportProfiler(self._data_path / ".konfi" / "profile.json"))
+        
+        self._instrumented = bool(self._hooks)
+        self._events: list[tuple[str, Any]] = None # 子进程中缓存的事件, 随解析结果返回主进程
+        if self._instrumented:
+            self._reader = TimedReader(self._reader)
         
         self._load_parsers()
     
+    @staticmethod
+    def _make_target(writer: str | Writer, target_dir: str, options: dict[str, Any]=None) -> tuple[Writer, Path]:
+        """ 创建导出目标, 每个目标使用独立的写入器, 同一格式的多个目标可使用不同选项
+        """
+        if isinstance(writer, Writer):
+            if options:
+                raise ValueError(f"[konfi] 写入器 {writer.ext} 的选项需在创建写入器时设置")
+            
+            return writer, Path(target_dir)
+        
+        return Writer.create(writer, **(options or {})), Path(target_dir)
+    
+    def __getstate__(self) -> dict:
+        """ 发送到子进程时不携带回调与已解析的数据, 子进程解析到独立的数据中
+        """
+        state = self.__dict__.copy()
+        state["_hooks"] = []
+        state["_export_data"] = {}
+        return state
+    
+    def _emit(self, event: str, *args: Any):
+        """ 触发回调, 子进程中先缓存
+        """
+        if self._events is not None:
+            self._events.append((event, args))
+            return
+        
+        for hook in self._hooks:
+            getattr(hook, event)(*args)
+    
     def _load_parsers(self):
         """ 加载所有解析器
         """
@@ -77,52 +143,31 @@ class Exportor:
         return self._default_parser
 
 
+    def _find_tables(self) -> list[Path]:
+        """ 表格目录下所有有效的表格文件, 忽略临时文件与注释表格
+        """
+        is_valid = lambda p: p.is_file() and not p.name.startswith(("~$", "#"))
+        return [p for p in Path(self._table_dir).glob("**/*.xlsx") if is_valid(p)]
+    
+    def _is_enum_table(self, path: Path) -> bool:
+        return bool(self._enum_tables) and (path.name in self._enum_tables or path.stem in self._enum_tables)
+    
     def _gather_all_tables(self):
         """ 搜索所有表格文件
         """
-        path = Path(self._table_dir)
-        print(f"[konfi] 搜索表格路径: {path}\n")
+        print(f"[konfi] 搜索表格路径: {Path(self._table_dir)}\n")
         
-        is_valid = lambda p: p.is_file() and not p.name.startswith(("~$", "#"))
-        for p in path.glob("**/*.xlsx"):
-            if not is_valid(p):
-                continue
-            
-            if self._enum_tables and (p.name in self._enum_tables or p.stem in self._enum_tables):
+        for p in self._find_tables():
+            if self._is_enum_table(p):
                 self._enum_table_paths.append(p)
             else:
                 self._config_table_paths.append(p)
     
     
-    def _proc_mergedcell(self, ws: Worksheet):
-        """ 处理合并单元格, 否则被合并的单元格值为 None
-        """
-        for cr in ws.merged_cells.ranges:
-            min_c, min_r, max_c, max_r = cr.bounds
-            top_left = ws.cell(min_r, min_c)
-            for r in range(min_r, max_r + 1):
-                for c in range(min_c, max_c + 1):
-                    if r != min_r or c != min_c:
-                        ws._cells[(r, c)] = top_left
-
-    def _calc_sheet_md5(self, ws: Worksheet):
-        lines = []
-        for r in ws.iter_rows(values_only=True):
-            line = "".join(str(v) for v in r)
-            lines.append(line)
-            
-        md5 = hashlib.md5("\n".join(lines).encode("utf-8"))
-        return md5.hexdigest()
-
-    def _parse_sheet(self, ws: Worksheet, table_path: Path):
-        """ 解析 worksheet
+    def _split_title(self, title: str) -> tuple[str, str, str]:
+        """ 拆分 sheet 标题 module.sheet_name@label, 返回 (sheet_name, module, label)
         """
-        sheet_name = ws.title
-        if sheet_name.startswith("#"): # sheet 被注释
-            return 
-        
-        self._proc_mergedcell(ws)
-
+        sheet_name = title
         if "@" in sheet_name:
             sheet_name, _, label = sheet_name.partition("@")
         else:
@@ -132,6 +177,37 @@ class Exportor:
             module, _, sheet_name = sheet_name.partition(".")
         else:
             module = None
+        
+        return sheet_name, module, label
+
+    def _select_sheet(self, title: str, only: set[str]=None) -> bool:
+        """ 按 sheet 标题判断配置表 sheet 是否需要解析, 在读取器解码 sheet 前调用
+            过滤注释的 sheet, only 之外的 sheet 与 include / exclude 不匹配的 sheet
+        """
+        if title.startswith("#"):
+            return False
+        
+        sheet_name = self._split_title(title)[0]
+        if only is not None and sheet_name not in only:
+            return False
+        
+        if self._include and not any(fnmatch.fnmatchcase(sheet_name, pat) for pat in self._include):
+            return False
+        
+        return not any(fnmatch.fnmatchcase(sheet_name, pat) for pat in self._exclude)
+    
+    def _select_enum_sheet(self, title: str) -> bool:
+        """ 枚举表只过滤注释的 sheet, 配置表依赖完整的枚举
+        """
+        return not title.startswith("#")
+
+    def _parse_sheet(self, ws: Worksheet, table_path: Path) -> tuple[str, Parser]:
+        """ 解析 worksheet, 返回导出的 sheet 名与所用解析器
+        """
+        if ws.title.startswith("#"): # sheet 被注释
+            return 
+
+        sheet_name, module, label = self._split_title(ws.title)
             
         if sheet_name in self._export_data:
             data = self._export_data[sheet_name]
@@ -140,71 +216,253 @@ class Exportor:
         
         # 解析 sheet
         parser = self._get_parser_for(sheet_name, ws)
+        parser.compact = self._compact
+        start = time.perf_counter()
         parser.parse(ws, data, self._enum_data)
         
+        if self._instrumented: # 解析耗时扣除读取器解码行的耗时
+            load = ws.load
+            self._emit("on_parse", SheetStats(table_path, ws.title, type(parser).__name__, ws.rows, ws.cells, time.perf_counter() - start - load, load))
+        
         if info := data.get("_info"):
             info["label"] = label
             info["module"] = module
             info["sheet_type"] = parser.sheet_type
             info["table_path"] = table_path
+            info["parser"] = type(parser).__name__
         else:
             data["_info"] = { 
                 "label": label, 
                 "module": module, 
                 "sheet_type": parser.sheet_type,
                 "table_path": table_path,
+                "parser": type(parser).__name__,
             }
+        
+        return sheet_name, parser
+
+    def _parse_config_table(self, table_path: Path, only: set[str]=None) -> list[tuple[str, str, dict]]:
+        """ 解析单个配置表到独立的数据中, only 不为空时只解析其中的 sheet
+            返回按解析顺序排列的 [(sheet 名, 解析器名, 数据)], 表格内的同名 sheet 已合并
+        """
+        export_data = self._export_data
+        self._export_data = {}
+        
+        try:
+            names = {}
+            select: Callable[[str], bool] = lambda title: self._select_sheet(title, only)
+            for ws in self._reader.read(table_path, select):
+                if res := self._parse_sheet(ws, table_path):
+                    sheet_name, parser = res
+                    names[sheet_name] = type(parser).__name__
+            
+            if self._instrumented:
+                self._emit("on_load", LoadStats(table_path, self._reader.load))
+            
+            return [(sheet_name, parser_name, self._export_data[sheet_name]) for sheet_name, parser_name in names.items()]
+        
+        finally:
+            self._export_data = export_data
+
+    def _parse_config_tables(self, tasks: list[tuple[Path, set[str]]]) -> list[list[tuple[str, str, dict]]]:
+        """ 解析多个配置表, tasks 为 [(表格, 需要解析的 sheet)], 结果与 tasks 顺序一致
+            workers 大于 1 时多进程解析, 枚举数据随 exportor 一起发送到子进程
+        """
+        if self._workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(
+                max_workers=self._workers, 
+                initializer=_init_worker, 
+                initargs=(self,),
+            ) as pool:
+                results = []
+                for parsed, events in pool.map(_parse_config_table, tasks):
+                    for event, args in events or ():
+                        self._emit(event, *args)
+                    results.append(parsed)
+                
+                return results
+        
+        return [self._parse_config_table(table_path, only) for table_path, only in tasks]
+
+    def _merge_table(self, table_path: Path, parsed: list[tuple[str, str, dict]], cached: set[str]):
+        """ 合并单个配置表的解析结果到导出数据, 与在导出数据上直接解析一致
+            cached 为其中来自缓存的 sheet
+        """
+        sheet_names = self._table_sheets.setdefault(table_path, [])
+        for sheet_name, parser_name, data in parsed:
+            if sheet_name not in sheet_names:
+                sheet_names.append(sheet_name)
+            
+            self._sheet_deps.add_sheet(sheet_name, data["_info"])
+            data["_info"]["cached"] = sheet_name in cached
+            
+            if sheet_name in self._export_data:
+                old_data = self._export_data[sheet_name]
+                old_cached = old_data["_info"]["cached"]
+                Parser.get_parser(parser_name).merge(old_data, data)
+                old_data["_info"]["cached"] = old_cached and sheet_name in cached # 合并了新数据需要重新导出
+            else:
+                self._export_data[sheet_name] = data
 
     def _parse_all_tables(self):
         """ 解析 table / workbook
         """
         # 1. 枚举表
         for table_path in self._enum_table_paths:
-            wb: Workbook = xl.load_workbook(filename=table_path, read_only=False, data_only=True)
-            for ws in wb.worksheets:
-                self._parse_sheet(ws, table_path)
+            for ws in self._reader.read(table_path, self._select_enum_sheet):
+                if res := self._parse_sheet(ws, table_path):
+                    self._enum_sheets.add(res[0])
+            
+            if self._instrumented:
+                self._emit("on_load", LoadStats(table_path, self._reader.load))
 
-        # 2. 配置表
+        # 2. 配置表, 未变化的表格直接读取缓存
+        results: dict[Path, list[tuple[str, str, dict]]] = {}
+        cached: dict[Path, set[str]] = {} # 各表格中来自缓存的 sheet
         for table_path in self._config_table_paths:
-            wb: Workbook = xl.load_workbook(filename=table_path, read_only=False, data_only=True)
-            for ws in wb.worksheets:
-                if self._is_inc: # 增量导表 检测 并 更新 md5
-                    ws_md5 = self._calc_sheet_md5(ws)
-                    if self._md5.get(ws.title) == ws_md5:
-                        continue
-                    else:
-                        self._md5[ws.title] = ws_md5
+            if self._cache and (parsed := self._cache.load(table_path)) is not None:
+                results[table_path] = parsed
+                cached[table_path] = { sheet_name for sheet_name, _, _ in parsed }
+        
+        dirty_paths = [p for p in self._config_table_paths if p not in results]
+        for table_path, parsed in zip(dirty_paths, self._parse_config_tables([(p, None) for p in dirty_paths])):
+            results[table_path] = parsed
+            cached[table_path] = set()
+        
+        # 3. 增量导表, 重新解析依赖变化枚举或 sheet 的缓存 sheet
+        if self._cache:
+            changed_enums = self._cache.check_enums(self._enum_data)
+            changed_sheets = { sheet_name for p in dirty_paths for sheet_name, _, _ in results[p] }
+            
+            graph = DepGraph()
+            for table_path, names in cached.items():
+                for sheet_name, _, data in results[table_path]:
+                    if sheet_name in names:
+                        graph.add_sheet(sheet_name, data["_info"])
+            
+            stale = graph.dependents(changed_enums, changed_sheets)
+            tasks = [(p, names & stale) for p, names in cached.items() if names & stale]
+            for (table_path, only), parsed in zip(tasks, self._parse_config_tables(tasks)):
+                print(f"[konfi] 增量导表: {table_path} 中 {', '.join(sorted(only))} 的依赖变化, 重新解析")
                 
-                self._parse_sheet(ws, table_path)
+                fresh = { res[0]: res for res in parsed }
+                results[table_path] = [fresh.get(res[0], res) for res in results[table_path]]
+                cached[table_path] -= only
+            
+            # 保存有变化的表格, 需在合并与写入修改数据前
+            for table_path in dirty_paths + [p for p, _ in tasks]:
+                self._cache.store(table_path, results[table_path])
+            
+            for table_path in self._config_table_paths:
+                if names := cached[table_path]:
+                    print(f"[konfi] 增量导表: {table_path} 中 {', '.join(sorted(names))} 未变化, 使用缓存")
+            
+            self._cache_stats["cached"] = sum(len(names) for names in cached.values())
+            self._cache_stats["parsed"] = sum(len(parsed) for parsed in results.values()) - self._cache_stats["cached"]
 
+        # 4. 按表格顺序合并
+        for table_path in self._config_table_paths:
+            self._merge_table(table_path, results.pop(table_path), cached[table_path])
+
+    
+    def _write_data(self, sheet_names: set[str]=None):
+        """ 写入数据到文件, 各 sheet 先由解析器转为列式中间表示
+            sheet_names 不为空时只写入其中的 sheet
+        """
+        tables = {}
+        for sheet_name, data in self._export_data.items():
+            if sheet_names is None or sheet_name in sheet_names:
+                tables[sheet_name] = Parser.get_parser(data["_info"]["parser"]).to_table(sheet_name, data)
+        
+        for writer, _ in self._targets:
+            writer.on_write = self._on_write if self._instrumented else None
+        
+        try:
+            write_targets(self._targets, tables, self._workers)
+        finally:
+            for writer, _ in self._targets:
+                writer.on_write = None
     
-    def _write_data(self):
-        """ 写入数据到文件
+    def _on_write(self, stats: WriteStats):
+        self._emit("on_write", stats)
+    
+    def _stage(self, stage: str, func):
+        """ 执行一个阶段, 统计耗时
         """
-        self._writer.write(self._export_data, self._data_path)
+        start = time.perf_counter()
+        func()
+        if self._instrumented:
+            self._emit("on_stage", stage, time.perf_counter() - start)
     
     
     def run(self):
+        start = time.perf_counter()
+        cache_start = EType.cache_info()
+        
         if self._is_inc:
-            path = self._data_path / "md5.json"
-            if path.is_file():
-                with path.open("r", encoding="utf-8") as f:
-                    self._md5 = json.load(f)
+            tag = f"compact={self._compact}"
+            if self._include or self._exclude: # 过滤 sheet 时缓存只包含部分 sheet
+                tag += f";include={self._include};exclude={self._exclude}"
+            
+            self._cache = ExportCache(self._data_path / ".konfi", tag)
         
         # 1. 搜索所有表格文件
-        self._gather_all_tables()
+        self._stage("gather", self._gather_all_tables)
 
         # 2. 解析所有表格文件
-        self._parse_all_tables()
+        self._stage("parse", self._parse_all_tables)
 
         # 3. 导出数据
-        self._write_data()
+        self._stage("write", self._write_data)
+        
+        cache_info = EType.cache_info()
+        hits = cache_info["hits"] - cache_start["hits"]
+        misses = cache_info["misses"] - cache_start["misses"]
+        if self._profile: # 默认导出不输出, 回调通过 on_finish 获取
+            print(f"[konfi] 类型缓存 命中 {hits} 未命中 {misses}")
+
+        if self._cache:
+            print("[konfi] 更新增量缓存")
+            self._cache.save(self._config_table_paths)
+        
+        if self._instrumented:
+            self._emit("on_finish", {
+                "writer": ",".join(writer.ext for writer, _ in self._targets),
+                "workers": self._workers,
+                "total": time.perf_counter() - start,
+                "etype_cache": { "hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else None },
+                "inc_cache": dict(self._cache_stats) if self._cache else None,
+                "peak_memory": peak_memory(),
+            })
+
+
+    def watch(self, interval: float=0.25):
+        """ 完整导出后持续监视表格目录, 表格保存后只重新导出受影响的 sheet
+        """
+        ExportWatcher(self, interval).run()
 
-        if self._is_inc:
-            print("[konfi] 更新 md5.json")
-            path = self._data_path / "md5.json"
-            with path.open("w", encoding="utf-8") as f:
-                json.dump(self._md5, f, indent=4)
 
+# ----------------------------- 子进程 -----------------------------------
 
+_worker_exportor: Exportor = None
 
+def _init_worker(exportor: Exportor):
+    """ 子进程初始化, 保存携带枚举数据的 exportor 副本
+    """
+    global _worker_exportor
+    _worker_exportor = exportor
+    
+    # 回调只在主进程执行, 子进程中的事件缓存后随解析结果返回
+    exportor._hooks = []
+    if exportor._instrumented:
+        exportor._events = []
+
+def _parse_config_table(task: tuple[Path, set[str]]) -> tuple[list[tuple[str, str, dict]], list[tuple[str, Any]] | None]:
+    """ 子进程中解析单个配置表, 同时返回期间缓存的事件
+    """
+    parsed = _worker_exportor._parse_config_table(*task)
+    events = _worker_exportor._events
+    if events is not None:
+        _worker_exportor._events = []
+    
+    return parsed, events
@@ -0,0 +1,197 @@
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+import threading
+import time
+
+from ..etypes import EnumRegistry
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError: # 可选依赖, 未安装时轮询
+    Observer = None
+
+if TYPE_CHECKING:
+    from .exportor import Exportor
+
+
+class ExportWatcher:
+    """ 监视表格目录, 表格保存后只重新解析与写入其中的 sheet 及依赖它们的 sheet
+        枚举, 各 sheet 的解析结果与写入器常驻内存
+        安装 watchdog 时由文件系统事件唤醒, 否则按 interval 轮询文件状态
+    """
+
+    def __init__(self, exportor: Exportor, interval: float=0.25):
+        self._exportor = exportor
+        self._interval = interval
+        self._stats: dict[Path, tuple[int, int]] = {} # { 表格: (mtime_ns, size) }
+        self._wake = threading.Event()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stats = {}
+        for p in self._exportor._find_tables():
+            try:
+                st = p.stat()
+            except OSError: # 保存过程中被替换
+                continue
+
+            stats[p] = (st.st_mtime_ns, st.st_size)
+
+        return stats
+
+    def _start_observer(self):
+        if Observer is None:
+            return None
+
+        wake = self._wake
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if str(event.src_path).endswith(".xlsx") or str(getattr(event, "dest_path", "")).endswith(".xlsx"):
+                    wake.set()
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self._exportor._table_dir), recursive=True)
+        observer.start()
+        return observer
+
+    def _wait(self, observer):
+        if observer is None:
+            time.sleep(self._interval)
+            return
+
+        self._wake.wait(timeout=2.0) # 兜底轮询, 防止遗漏事件
+        self._wake.clear()
+
+    # -----------------------------------------------------------------
+
+    def _update(self, changed: set[Path], stats: dict[Path, tuple[int, int]]) -> set[str]:
+        """ 重新导出变化的表格, 返回重新写入的 sheet
+            解析出错时恢复原有数据, 不写入任何文件
+        """
+        exportor = self._exportor
+        enum_paths = [p for p in stats if exportor._is_enum_table(p)]
+        config_paths = [p for p in stats if not exportor._is_enum_table(p)]
+
+        old_enum_data = exportor._enum_data
+        old_export_data = exportor._export_data
+        affected: set[str] = set()
+
+        try:
+            # 1. 枚举表变化时重新解析所有枚举表, 比较得到内容变化的枚举类
+            changed_enums = set()
+            enum_sheets = exportor._enum_sheets
+            enum_export_data = {}
+            if any(exportor._is_enum_table(p) for p in changed):
+                exportor._enum_data = EnumRegistry()
+                exportor._export_data = enum_export_data
+                enum_sheets = set()
+                for table_path in enum_paths:
+                    for ws in exportor._reader.read(table_path, exportor._select_enum_sheet):
+                        if res := exportor._parse_sheet(ws, table_path):
+                            enum_sheets.add(res[0])
+
+                exportor._export_data = old_export_data
+                changed_enums = {
+                    enum_cls for enum_cls in exportor._enum_data.keys() | old_enum_data.keys()
+                    if repr(exportor._enum_data.get(enum_cls)) != repr(old_enum_data.get(enum_cls))
+                }
+                affected |= exportor._enum_sheets | enum_sheets
+
+            # 2. 重新解析变化的配置表
+            dirty = [p for p in config_paths if p in changed]
+            parsed = dict(zip(dirty, exportor._parse_config_tables([(p, None) for p in dirty])))
+
+            for table_path in changed:
+                affected |= set(exportor._table_sheets.get(table_path, ()))
+
+            for table_path in dirty:
+                for sheet_name, _, data in parsed[table_path]:
+                    affected.add(sheet_name)
+                    exportor._sheet_deps.add_sheet(sheet_name, data["_info"])
+
+            affected |= exportor._sheet_deps.dependents(changed_enums, affected)
+
+            # 3. 受影响的 sheet 在未变化的表格中的部分也需重新解析, 才能按表格顺序重新合并
+            tasks = []
+            for table_path in config_paths:
+                if table_path not in parsed and (only := set(exportor._table_sheets.get(table_path, ())) & affected):
+                    tasks.append((table_path, only))
+
+            for (table_path, _), res in zip(tasks, exportor._parse_config_tables(tasks)):
+                parsed[table_path] = res
+
+        except Exception:
+            exportor._enum_data = old_enum_data
+            exportor._export_data = old_export_data
+            raise
+
+        # 4. 替换受影响 sheet 的数据
+        for sheet_name in affected:
+            exportor._export_data.pop(sheet_name, None)
+
+        exportor._export_data.update(enum_export_data)
+        exportor._enum_sheets = enum_sheets
+        exportor._enum_table_paths = enum_paths
+        exportor._config_table_paths = config_paths
+
+        for table_path in changed:
+            exportor._table_sheets.pop(table_path, None)
+
+        for table_path in config_paths:
+            if table_path in parsed:
+                exportor._merge_table(table_path, parsed[table_path], set())
+
+        for sheet_name in sorted(affected - exportor._export_data.keys()):
+            print(f"[konfi] 警告: sheet {sheet_name} 已移除, 导出的文件需手动删除")
+
+        # 5. 只写入受影响的 sheet
+        sheet_names = affected & exportor._export_data.keys()
+        exportor._stage("write", lambda: exportor._write_data(sheet_names))
+        return sheet_names
+
+    def run(self):
+        """ 完整导出一次后持续监视, Ctrl+C 退出
+        """
+        exportor = self._exportor
+        exportor.run()
+        self._stats = self._scan()
+
+        observer = self._start_observer()
+        print(f"[konfi] 监视表格路径: {Path(exportor._table_dir)} ({'watchdog' if observer else '轮询'}), Ctrl+C 退出")
+
+        try:
+            while True:
+                self._wait(observer)
+                stats = self._scan()
+                if stats == self._stats:
+                    continue
+
+                # 等待保存完成, 文件状态在一个间隔内不再变化
+                time.sleep(self._interval)
+                if self._scan() != stats:
+                    continue
+
+                changed = { p for p in stats.keys() | self._stats.keys() if stats.get(p) != self._stats.get(p) }
+                self._stats = stats
+                print(f"[konfi] 表格变化: {', '.join(p.name for p in sorted(changed))}")
+
+                start = time.perf_counter()
+                try:
+                    sheet_names = self._update(changed, stats)
+                except Exception as e: # 表格有误时保留原数据继续监视, 下次保存再重试
+                    print(f"[konfi] 重新导出失败: {e}")
+                    continue
+
+                print(f"[konfi] 重新导出 {len(sheet_names)} 个 sheet, 耗时 {time.perf_counter() - start:.2f}s")
+
+        except KeyboardInterrupt:
+            print("[konfi] 停止监视")
+
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
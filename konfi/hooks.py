@@ -0,0 +1,198 @@
+
+""" 导出流程的性能回调与分析报告
+    Exportor(hooks=[...]) 注册 ExportHook, profile=True 时在 data/.konfi/profile.json 写入分析报告
+    多进程解析时子进程中的事件随解析结果返回, 在主进程中回调
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError: # windows 没有 resource 模块, 不统计内存峰值
+    resource = None
+
+
+@dataclass(slots=True)
+class LoadStats:
+    """ 读取一个表格文件, seconds 为打开 workbook 与解码行的累计耗时
+    """
+    table_path: Path
+    seconds: float
+
+
+@dataclass(slots=True)
+class SheetStats:
+    """ 解析一个 sheet, seconds 不含读取器解码行的耗时 (load)
+        cells 为非空单元格数
+    """
+    table_path: Path
+    title: str
+    parser: str
+    rows: int
+    cells: int
+    seconds: float
+    load: float
+
+
+@dataclass(slots=True)
+class WriteStats:
+    """ 写入一个文件, extra 为写入器的附加耗时, 如 PyWriter 的 black
+    """
+    sheet_name: str
+    file_path: Path
+    seconds: float
+    bytes: int
+    extra: dict[str, float] = field(default_factory=dict)
+
+
+class ExportHook:
+    """ 导出事件回调, 按需重写
+    """
+
+    def on_stage(self, stage: str, seconds: float):
+        """ 阶段完成, stage 为 gather | parse | write
+        """
+        pass
+
+    def on_load(self, stats: LoadStats):
+        pass
+
+    def on_parse(self, stats: SheetStats):
+        pass
+
+    def on_write(self, stats: WriteStats):
+        pass
+
+    def on_finish(self, summary: dict):
+        """ 导出完成, summary 包含总耗时, 缓存命中与内存峰值
+        """
+        pass
+
+
+# ----------------------------- 读取计时 -----------------------------------
+
+_END = object()
+
+class TimedSheet:
+    """ 统计 sheet 解码行的耗时, 行数与非空单元格数, 其余属性转发给原 sheet
+    """
+
+    def __init__(self, ws: Any):
+        self._ws = ws
+        self.title: str = ws.title
+        self.load = 0.0
+        self.rows = 0
+        self.cells = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._ws, name)
+
+    def iter_rows(self, values_only: bool=True) -> Iterator[tuple]:
+        clock = time.perf_counter
+        it = self._ws.iter_rows(values_only=values_only)
+        while True:
+            t = clock()
+            row = next(it, _END)
+            self.load += clock() - t
+            if row is _END:
+                return
+
+            self.rows += 1
+            self.cells += len(row) - row.count(None)
+            yield row
+
+
+class TimedReader:
+    """ 包装读取器, 统计每个表格文件的读取耗时
+    """
+
+    def __init__(self, reader: Any):
+        self._reader = reader
+        self.load = 0.0 # 当前表格的读取耗时
+
+    def read(self, table_path: Path, select: Callable[[str], bool]=None) -> Iterator[TimedSheet]:
+        clock = time.perf_counter
+        self.load = 0.0
+        it = iter(self._reader.read(table_path, select))
+        sheets: list[TimedSheet] = []
+        try:
+            while True:
+                t = clock()
+                ws = next(it, _END)
+                self.load += clock() - t
+                if ws is _END:
+                    return
+
+                ws = TimedSheet(ws)
+                sheets.append(ws)
+                yield ws
+
+        finally:
+            self.load += sum(ws.load for ws in sheets)
+
+
+def peak_memory() -> int | None:
+    """ 进程 (含已结束的子进程) 内存峰值, 字节
+    """
+    if resource is None:
+        return None
+
+    unit = 1 if sys.platform == "darwin" else 1024 # macOS 为字节, linux 为 KB
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage * unit
+
+
+# ----------------------------- 分析报告 -----------------------------------
+
+class ExportProfiler(ExportHook):
+    """ 收集所有事件, 导出完成时写入 json 报告
+    """
+
+    def __init__(self, report_path: Path | None=None):
+        self._report_path = report_path
+        self.report: dict[str, Any] = {
+            "time": datetime.now().isoformat(sep=" ", timespec="seconds"),
+            "stages": {},
+            "tables": [],
+            "sheets": [],
+            "writes": [],
+        }
+
+    def on_stage(self, stage: str, seconds: float):
+        self.report["stages"][stage] = round(seconds, 6)
+
+    def on_load(self, stats: LoadStats):
+        self.report["tables"].append({ "table_path": stats.table_path.as_posix(), "seconds": round(stats.seconds, 6) })
+
+    def on_parse(self, stats: SheetStats):
+        res = asdict(stats)
+        res["table_path"] = stats.table_path.as_posix()
+        res["seconds"] = round(stats.seconds, 6)
+        res["load"] = round(stats.load, 6)
+        self.report["sheets"].append(res)
+
+    def on_write(self, stats: WriteStats):
+        res = asdict(stats)
+        res["file_path"] = stats.file_path.as_posix()
+        res["seconds"] = round(stats.seconds, 6)
+        self.report["writes"].append(res)
+
+    def on_finish(self, summary: dict):
+        self.report.update(summary)
+
+        if self._report_path is None:
+            return
+
+        self._report_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._report_path.open("w", encoding="utf-8") as f:
+            json.dump(self.report, f, indent=4, ensure_ascii=False)
+
+        print(f"[konfi] 性能报告写入 {self._report_path}")
@@ -0,0 +1,267 @@
+
+""" kbin 二进制配置格式与运行时读取器
+    只依赖标准库, 可单独拷贝到服务端使用
+
+    文件结构 (小端):
+      magic "KBIN" | u32 头长度 | 头 (json) | 对齐到 8 字节 | 数据区 (各段 8 字节对齐)
+    头记录 sheet 信息与各段相对数据区的偏移:
+      kind     "table" 按列存储的行数据, "value" 单个值 (键值表, 枚举表)
+      rows     行数
+      primary  主键变量名
+      columns  [{ "var", "type", "offset", "nulls" }] 列类型为 i8 | f8 | b1 | str | obj
+      strings  字符串表偏移: u32 数量 | u32 偏移 * (数量 + 1) | utf-8 数据
+      blob     嵌套值数据偏移, 值以 1 字节标签开头
+      indexes  { 索引名: { "vars", "offset" } } 二级索引, blob 中按索引列嵌套的字典, 末层为行号列表
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterator
+import json
+import mmap
+import struct
+
+
+MAGIC = b"KBIN"
+VERSION = 1
+
+# 嵌套值标签
+T_NONE  = 0
+T_FALSE = 1
+T_TRUE  = 2
+T_INT   = 3 # i64
+T_FLOAT = 4 # f64
+T_STR   = 5 # u32 字符串索引
+T_LIST  = 6 # u32 数量 + 元素
+T_DICT  = 7 # u32 数量 + 键值
+T_SET   = 8 # u32 数量 + 元素
+T_BIGINT = 9 # 超出 i64 的整数, u32 字符串索引
+
+NULL_STR = 0xFFFFFFFF # str 列空值
+NULL_BOOL = 2 # b1 列空值
+
+_u32 = struct.Struct("<I")
+_i64 = struct.Struct("<q")
+_f64 = struct.Struct("<d")
+_col_structs = { "i8": _i64, "f8": _f64, "b1": struct.Struct("<B"), "str": _u32, "obj": _u32 }
+
+
+class KbinSheet:
+    """ kbin 文件读取器, 内存映射文件, 按主键取行时才解码
+        多个进程读取同一文件时共享页缓存
+    """
+
+    def __init__(self, path: Path | str):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:4] != MAGIC:
+            self.close()
+            raise ValueError(f"[konfi] {path} 不是 kbin 文件")
+
+        header_len, = _u32.unpack_from(self._mm, 4)
+        self._header: dict = json.loads(self._mm[8:8 + header_len].decode("utf-8"))
+        if self._header["version"] != VERSION:
+            self.close()
+            raise ValueError(f"[konfi] {path} kbin 版本 {self._header['version']} 不支持")
+
+        base = 8 + header_len + (-(8 + header_len) % 8) # 数据区起点, 偏移转为文件内绝对偏移
+        self._header["strings"] += base
+        self._header["blob"] += base
+        for col in self._header["columns"]:
+            col["offset"] += base
+            if col["nulls"] is not None:
+                col["nulls"] += base
+
+        self._columns = { col["var"]: col for col in self._header["columns"] }
+        self._str_count, = _u32.unpack_from(self._mm, self._header["strings"])
+        self._index: dict | None = None # { 主键: 行号 }, 首次按主键访问时构建
+        self._indexes: dict[str, dict] = {} # 已解码的二级索引
+
+    def __enter__(self) -> KbinSheet:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    # ----------------------- 解码 ---------------------------------
+
+    def _str(self, idx: int) -> str:
+        base = self._header["strings"] + 4
+        start, end = struct.unpack_from("<II", self._mm, base + 4 * idx)
+        data_base = base + 4 * (self._str_count + 1)
+        return self._mm[data_base + start:data_base + end].decode("utf-8")
+
+    def _decode(self, offset: int) -> tuple[Any, int]:
+        """ 解码 offset 处的嵌套值, 返回 (值, 下一个值的偏移)
+        """
+        mm = self._mm
+        tag = mm[offset]
+        offset += 1
+
+        if tag == T_NONE:
+            return None, offset
+        if tag == T_FALSE:
+            return False, offset
+        if tag == T_TRUE:
+            return True, offset
+        if tag == T_INT:
+            return _i64.unpack_from(mm, offset)[0], offset + 8
+        if tag == T_FLOAT:
+            return _f64.unpack_from(mm, offset)[0], offset + 8
+        if tag == T_STR:
+            return self._str(_u32.unpack_from(mm, offset)[0]), offset + 4
+        if tag == T_BIGINT:
+            return int(self._str(_u32.unpack_from(mm, offset)[0])), offset + 4
+
+        count, = _u32.unpack_from(mm, offset)
+        offset += 4
+        if tag == T_DICT:
+            res = {}
+            for _ in range(count):
+                k, offset = self._decode(offset)
+                res[k], offset = self._decode(offset)
+            return res, offset
+
+        items = []
+        for _ in range(count):
+            v, offset = self._decode(offset)
+            items.append(v)
+
+        if tag == T_LIST:
+            return items, offset
+        if tag == T_SET:
+            return set(items), offset
+
+        raise ValueError(f"[konfi] kbin 未知标签 {tag}")
+
+    def _cell(self, col: dict, r: int) -> Any:
+        mm = self._mm
+        if col["nulls"] is not None and mm[col["nulls"] + (r >> 3)] >> (r & 7) & 1:
+            return None
+
+        col_type = col["type"]
+        val, = _col_structs[col_type].unpack_from(mm, col["offset"] + _col_structs[col_type].size * r)
+        match col_type:
+            case "b1":
+                return None if val == NULL_BOOL else bool(val)
+            case "str":
+                return None if val == NULL_STR else self._str(val)
+            case "obj":
+                return self._decode(self._header["blob"] + val)[0]
+
+        return val
+
+    def _build_index(self) -> dict:
+        primary = self._header["primary"]
+        cols = [self._columns[var] for var in primary]
+        index = {}
+        for r in range(self._header["rows"]):
+            key = tuple(self._cell(col, r) for col in cols)
+            index[key[0] if len(key) == 1 else key] = r
+
+        return index
+
+    # -----------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return self._header["sheet"]
+
+    @property
+    def primary(self) -> list[str]:
+        return self._header["primary"]
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    @property
+    def value(self) -> Any:
+        """ 键值表与枚举表的完整数据
+        """
+        if self._header["kind"] != "value":
+            raise TypeError(f"[konfi] {self.name} 是数据表, 请按主键访问")
+
+        return self._decode(self._header["blob"])[0]
+
+    def __len__(self) -> int:
+        return self._header["rows"]
+
+    def row(self, r: int) -> dict:
+        """ 按行号解码一行
+        """
+        return { var: self._cell(col, r) for var, col in self._columns.items() }
+
+    def get(self, key: Any, default: Any=None) -> dict | Any:
+        """ 按主键取行, 多主键时 key 为元组
+        """
+        if self._index is None:
+            self._index = self._build_index()
+
+        r = self._index.get(key, None)
+        return default if r is None else self.row(r)
+
+    def __getitem__(self, key: Any) -> dict:
+        row = self.get(key, None)
+        if row is None:
+            raise KeyError(key)
+
+        return row
+
+    def __contains__(self, key: Any) -> bool:
+        if self._index is None:
+            self._index = self._build_index()
+
+        return key in self._index
+
+    def keys(self) -> Iterator:
+        if self._index is None:
+            self._index = self._build_index()
+
+        return iter(self._index)
+
+    def find(self, name: str, *keys: Any) -> list[dict]:
+        """ 按二级索引查找行, keys 少于索引列数时返回其下所有行
+        """
+        node = self._indexes.get(name, None)
+        if node is None:
+            node = self._decode(self._header["blob"] + self._header["indexes"][name]["offset"])[0]
+            self._indexes[name] = node
+
+        for key in keys:
+            node = node.get(key, None)
+            if node is None:
+                return []
+
+        row_nums = []
+        todo = [node]
+        while todo:
+            node = todo.pop()
+            if isinstance(node, list):
+                row_nums += node
+            else:
+                todo += reversed(node.values())
+
+        return [self.row(r) for r in row_nums]
+
+    def rows(self) -> Iterator[dict]:
+        for r in range(self._header["rows"]):
+            yield self.row(r)
+
+    def column(self, var: str) -> list:
+        """ 读取一整列
+        """
+        col = self._columns[var]
+        return [self._cell(col, r) for r in range(self._header["rows"])]
+
+
+def load(path: Path | str) -> KbinSheet:
+    """ 打开 kbin 文件
+    """
+    return KbinSheet(path)
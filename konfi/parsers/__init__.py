@@ -1,5 +1,6 @@
 
-from .parser import Parser, SheetType, SheetConfig
+from .parser import Parser, SheetType, SheetConfig, RowType
+from .sheet_table import SheetTable
 from .common_parser import CommonParser
 from .enum_parser import EnumParser
 from .kv_parser import KVParser
@@ -2,8 +2,8 @@
 from openpyxl.worksheet.worksheet import Worksheet
 from typing import Any
 
-from .parser import Parser, SheetType, SheetConfig
-from ..etypes import EType, EEnumVal
+from .parser import Parser, SheetType, SheetConfig, SheetTable
+from ..etypes import EType, EEnumVal, EInt, EFloat, EBool, ETypeConverter
 
 
 class CommonParser(Parser):
@@ -20,12 +20,16 @@ class CommonParser(Parser):
         self._var_config = None # 记录 key 为 var 的配置
         self._primary = None # 主键列
         self._info = None # 其他关于该 sheet 的信息
+        self._plan: list[tuple[str, list[int], ETypeConverter]] = None # 列转换计划 [(var, [列], 转换器)]
+        self._batch_vars: set[str] = None # 批量转换的数值列
+        self._batch_rows: list[tuple[int, dict]] = None # 待批量转换的行 [(行号, 行数据)]
         
         self._cfg_names = [
             SheetConfig.VAR,   
             SheetConfig.TYPE,  
             SheetConfig.LABEL, 
             SheetConfig.PARAM, 
+            SheetConfig.INDEX,
         ]
 
     def _clear(self):
@@ -38,6 +42,9 @@ class CommonParser(Parser):
         self._var_config = None
         self._primary = None
         self._info = None
+        self._plan = None
+        self._batch_vars = None
+        self._batch_rows = None
 
     # ----------------------- 解析配置 ---------------------------------
     
@@ -79,57 +86,96 @@ class CommonParser(Parser):
                 cfg[row_0] = val
 
 
-    def _parse_config_rows(self, ws: Worksheet):
-        """ 解析所有配置行
+    def _end_config(self, ws: Worksheet):
+        """ 配置行解析完毕
             各列是什么类型, 变量名, 标签等信息
         """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or (row[0] and row[0].startswith("#")): # 跳过空行 与 注释行
-                continue
-            
-            if row[0] not in self._cfg_names: # 非配置行结束解析
-                break
-
-            self._parse_config(r, row)
-    
         if not self._primary:
             print(f"[konfi] 警告: {ws.title} 没有主键")
+        
+        self._compile_plan()
+        self._collect_indexes()
+    
+    def _compile_plan(self):
+        """ 把 !type 行编译为列转换计划, 每个变量只解析一次类型字符串
+        """
+        var_cols: dict[str, list[int]] = {} # { var: [列] }, 保持列顺序
+        for c, cfg in sorted(self._col_config.items()):
+            var_cols.setdefault(cfg[SheetConfig.VAR], []).append(c)
+        
+        self._plan = []
+        for var, cols in var_cols.items():
+            cfg = self._var_config[var]
+            etype = cfg.get(SheetConfig.TYPE, None)
+            param = cfg.get(SheetConfig.PARAM, None)
+            
+            try:
+                if etype is None:
+                    raise ValueError(f"变量 {var} 没有配置类型")
+                
+                if param is None:
+                    conv = EType.compile(etype, self._enum_data)
+                else:
+                    conv = EType.compile(etype, self._enum_data, param)
+            
+            except Exception as e:
+                raise Exception(f"[konfi] CommonParser {self._ws.title} 变量 {var} 类型 {etype} 解析出错: {e}")
+            
+            self._plan.append((var, cols, conv))
+        
+        self._info["columns"] = { var: conv for var, _, conv in self._plan }
+        
+        # 非主键的 int / float / bool 列先保存单元格原值, 解析完所有行后整列转换
+        # 枚举列只在紧凑存储时整列转换, 否则写入时仍需逐个还原为实例, 不如逐个转换
+        self._batch_vars = { 
+            var for var, cols, conv in self._plan 
+            if len(cols) == 1 and var not in self._primary and (
+                conv.etype_cls in (EInt, EFloat, EBool) and not conv.args and not conv.wargs
+                or conv.etype_cls is EEnumVal and self.compact
+            )
+        }
+    
+    def _collect_indexes(self):
+        """ 收集 !index 行声明的二级索引, { 索引名: [var] }, 按列顺序
+        """
+        indexes: dict[str, list[str]] = {}
+        for c, cfg in sorted(self._col_config.items()):
+            name = cfg.get(SheetConfig.INDEX, None)
+            if name is None:
+                continue
+            
+            var_list = indexes.setdefault(str(name), [])
+            if cfg[SheetConfig.VAR] not in var_list:
+                var_list.append(cfg[SheetConfig.VAR])
+        
+        if indexes and not self._primary:
+            print(f"[konfi] 警告: {self._ws.title} 没有主键, 忽略索引 {', '.join(indexes)}")
+            return
+        
+        self._info["indexes"] = indexes
     
     # -------------------------- 解析数据 -------------------------------
 
     def _parse_data(self, r: int, row: tuple):
         """ 解析数据
         """
-        row_data: dict[str, list[Any] | EType] = {} # { var: [] }
+        row_data: dict[str, EType] = {} # { var: EType }
+        row_len = len(row)
         
-        for c, val in enumerate(row): # 遍历列
-            if c == 0 or (c not in self._col_config): # 跳过第一列 与 未配置的列
-                continue 
+        for var, cols, conv in self._plan: # 遍历变量
+            if var in self._batch_vars: # 批量转换列, 暂存原值
+                row_data[var] = row[cols[0]] if cols[0] < row_len else None
+                continue
             
-            cfg = self._col_config[c]
-            var = cfg[SheetConfig.VAR]
-        
-            if var not in row_data:
-                row_data.setdefault(var, [])
+            data_list = [row[c] if c < row_len else None for c in cols]
             
-            row_data[var].append(val)
-        
-        for var, data_list in row_data.items():
-            cfg = self._var_config[var]
-            etype = cfg[SheetConfig.TYPE]
-            param = cfg.get(SheetConfig.PARAM, None)
-        
             try:
-                if param is None:
-                    etype = EType.create(etype, data_list, self._enum_data)
-                else:
-                    etype = EType.create(etype, data_list, self._enum_data, param)
+                etype = conv(data_list)
 
             except Exception:
                 raise Exception(f"[konfi] CommonParser {self._ws.title} 第 {r+1} 行解析数据出错")
             
-            row_data[var] = etype # 重新赋值为 EType
+            row_data[var] = etype
             
             if etype.enums: # 记录 sheet 用到的枚举类型
                 self._info["enums"] |= etype.enums
@@ -137,6 +183,15 @@ class CommonParser(Parser):
             if etype.refs:
                 self._info["refs"] |= etype.refs
 
+        # 紧凑存储, 类型由 _info["columns"] 按列保存
+        if self.compact:
+            row = { var: val if var in self._batch_vars else val.unbox() for var, val in row_data.items() }
+        else:
+            row = row_data
+        
+        if self._batch_vars:
+            self._batch_rows.append((r, row))
+
         # 重构数据结构
         data = self._data
         for idx, key in enumerate(self._primary): # 遍历主键
@@ -144,31 +199,116 @@ class CommonParser(Parser):
             if etype.val is None:
                 raise ValueError(f"{self._ws.title} 第 {r+1} 行主键 {key} 的值不能为空")
             
+            k = row[key] if self.compact else etype
             if idx == len(self._primary) - 1:  # 最后一个主键
-                if etype in data:  # 主键值已存在
+                if k in data:  # 主键值已存在
                     print(f"[konfi] 警告: {self._ws.title} 第 {r+1} 行主键 {key} {etype} 已存在, 发生配置覆盖")
                     
-                data[etype] = row_data  # 直接存储行数据
+                data[k] = row  # 直接存储行数据
             
-            elif etype in data:
-                data = data[etype]
+            elif k in data:
+                data = data[k]
 
             else:
-                data = data.setdefault(etype, {})
+                data = data.setdefault(k, {})
     
 
-    def _parse_data_rows(self, ws: Worksheet):
-        """ 解析所有数据行
+    def _convert_batch(self):
+        """ 整列转换暂存的数值 / 枚举列, 所有无法转换的单元格在同一个错误中报告
         """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or (row[0] and row[0].startswith(("#", "!"))):  # 跳过空行 配置行 注释行
+        errors = []
+        for var, _, conv in self._plan:
+            if var not in self._batch_vars:
                 continue
             
-            self._parse_data(r, row)
+            values, bad = conv.convert_column([row[var] for _, row in self._batch_rows])
+            for i in bad:
+                r, row = self._batch_rows[i]
+                errors.append(f"第 {r+1} 行 {var}: {row[var]!r}")
+            
+            if conv.etype_cls is EEnumVal and any(val is not None for val in values): # 记录 sheet 用到的枚举类型
+                self._info["enums"].add(conv.args[0].enum_cls)
+            
+            if self.compact:
+                for (_, row), val in zip(self._batch_rows, values):
+                    row[var] = val
+            else:
+                for (_, row), val in zip(self._batch_rows, values):
+                    row[var] = conv.box(val)
+        
+        if errors:
+            raise Exception(f"[konfi] CommonParser {self._ws.title} 以下单元格无法转换:\n  " + "\n  ".join(errors))
+    
+    # -------------------------- 二级索引 -------------------------------
 
+    def _iter_rows(self, data: dict, depth: int):
+        """ 遍历按主键嵌套的行数据
+        """
+        for k, v in data.items():
+            if isinstance(k, str) and k.startswith("_"):
+                continue
+            
+            if depth == 1:
+                yield v
+            else:
+                yield from self._iter_rows(v, depth - 1)
+    
+    def _build_indexes(self, data: dict):
+        """ 由行数据构建 _info["indexes"] 声明的二级索引, 存入 data["_index"]
+            { 索引名: { 索引列值: ... { 末个索引列值: [主键] } } }, 多主键时主键为列表, 空值不进入索引
+        """
+        indexes = data["_info"].get("indexes", None)
+        primary = data.get("_primary", None)
+        if not indexes or not primary:
+            data.pop("_index", None)
+            return
+        
+        res = { name: {} for name in indexes }
+        for row in self._iter_rows(data, len(primary)):
+            pk = row[primary[0]] if len(primary) == 1 else [row[key] for key in primary]
+            for name, var_list in indexes.items():
+                node = res[name]
+                for i, var in enumerate(var_list):
+                    val = row[var]
+                    if val is None or (isinstance(val, EType) and val.py_val is None):
+                        break
+                    
+                    try:
+                        node = node.setdefault(val, [] if i == len(var_list) - 1 else {})
+                    except TypeError:
+                        raise Exception(f"[konfi] CommonParser {data['_info']['title']} 索引 {name} 的列 {var} 类型不能作为索引")
+                else:
+                    node.append(pk)
+        
+        data["_index"] = res
+    
     # -----------------------------------------------------------------
 
+    def merge(self, data: dict, new_data: dict) -> None:
+        """ 列类型取两者并集, 合并后按新的行数据重建索引
+        """
+        new_info = new_data["_info"]
+        new_info["columns"] = { **data["_info"].get("columns", {}), **new_info.get("columns", {}) }
+        
+        super().merge(data, new_data)
+        self._build_indexes(data)
+
+    def to_table(self, sheet_name: str, data: dict) -> SheetTable:
+        info = data["_info"]
+        primary = data.get("_primary", None) or []
+        rows = list(self._iter_rows(data, len(primary))) if primary else []
+        
+        return SheetTable.from_rows(
+            sheet_name, 
+            info, 
+            data.get("_config", None), 
+            primary, 
+            info.get("columns", None) or {}, 
+            rows, 
+            info.get("compact", False), 
+            data.get("_index", None),
+        )
+
     @property
     def sheet_type(self) -> SheetType:
         return SheetType.COMMON
@@ -180,22 +320,24 @@ class CommonParser(Parser):
         self._col_config = {}
         self._var_config = {}
         self._primary = []
+        self._batch_vars = set()
+        self._batch_rows = []
         self._info = {
             "title": ws.title,
             "enums": set(),
             "refs": set(),
+            "compact": self.compact,
         }
         
-        # 1. 解析配置行
-        self._parse_config_rows(ws)
-        
-        # 2. 解析数据行
-        self._parse_data_rows(ws)
+        # 1. 单遍解析配置行与数据行, 再整列转换数值列
+        self._parse_rows(ws)
+        self._convert_batch()
         
-        # 3. 填充额外信息
+        # 2. 填充额外信息
         data["_config"] = self._var_config
         data["_primary"] = self._primary
         data["_info"] = self._info
+        self._build_indexes(data)
         
-        # 4. 清理缓存
+        # 3. 清理缓存
         self._clear()
@@ -56,19 +56,6 @@ class EnumParser(Parser):
             cfg[row_0] = val
 
 
-    def _parse_config_rows(self, ws: Worksheet):
-        """ 解析配置行
-        """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or row[0] == "#": # 跳过空行 与 注释行
-                continue
-            
-            if row[0] not in self._cfg_names: # 非配置行结束解析
-                break
-
-            self._parse_config(r, row)
-    
     # -------------------------- 解析数据 -------------------------------
 
     def _parse_data(self, r: int, row: tuple):
@@ -106,17 +93,9 @@ class EnumParser(Parser):
             data["enum_dict_alias"][enum_alias] = pack
     
 
-    def _parse_data_rows(self, ws: Worksheet):
-        """ 解析数据行
+    def _register_enums(self):
+        """ 注册解析出的枚举类型
         """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or (row[0] and row[0].startswith(("#", "!"))):  # 跳过空行 配置行 注释行
-                continue
-            
-            self._parse_data(r, row)
-        
-        # 注册解析出的枚举类型
         for enum_cls, val in self._data.items():
             eenum = EEnum(val)
             self._data[enum_cls] = eenum
@@ -141,11 +120,11 @@ class EnumParser(Parser):
             "title": ws.title,
         }
         
-        # 1. 解析配置行
-        self._parse_config_rows(ws)
+        # 1. 单遍解析配置行与数据行
+        self._parse_rows(ws)
         
-        # 2. 解析数据行
-        self._parse_data_rows(ws)
+        # 2. 注册枚举类型
+        self._register_enums()
         
         # 
         # self._data["_config"] = self._col_config
@@ -2,7 +2,7 @@
 from openpyxl.worksheet.worksheet import Worksheet
 from typing import Any
 
-from .parser import Parser, SheetType, SheetConfig
+from .parser import Parser, SheetType, SheetConfig, SheetTable
 from ..etypes import EType, EEnum, EnumPack, EEnumVal
 
 
@@ -72,19 +72,6 @@ class KVParser(Parser):
                 cfg[row_0] = val
 
 
-    def _parse_config_rows(self, ws: Worksheet):
-        """ 解析配置行
-        """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or row[0] == "#": # 跳过空行 与 注释行
-                continue
-            
-            if row[0] not in self._cfg_names: # 非配置行结束解析
-                break
-
-            self._parse_config(r, row)
-    
     # -------------------------- 解析数据 -------------------------------
 
     def _parse_data(self, r: int, row: tuple):
@@ -135,18 +122,16 @@ class KVParser(Parser):
         data[key] = row_data["val"]
             
 
-    def _parse_data_rows(self, ws: Worksheet):
-        """ 解析数据行
-        """
-        for r, row in enumerate(ws.iter_rows(values_only=True)):
-            row = self._clean_row_data(row)
-            if not any(row) or (row[0] and row[0].startswith(("#", "!"))):  # 跳过空行 配置行 注释行
-                continue
-            
-            self._parse_data(r, row)
-
     # -----------------------------------------------------------------
 
+    def to_table(self, sheet_name: str, data: dict) -> SheetTable:
+        """ 键值表为 key, val 两列, 每行类型不同, 直接保存 EType
+        """
+        items = [(k, v) for k, v in data.items() if not (isinstance(k, str) and k.startswith("_"))]
+        schema = { "key": None, "val": None }
+        columns = { "key": [k for k, _ in items], "val": [v for _, v in items] }
+        return SheetTable(sheet_name, "kv", data["_info"], data.get("_config", None), ["key"], schema, columns)
+
     @property
     def sheet_type(self) -> SheetType:
         return SheetType.KV
@@ -167,17 +152,14 @@ class KVParser(Parser):
             "refs": set(),
         }
         
-        # 1. 解析配置行
-        self._parse_config_rows(ws)
-        
-        # 2. 解析数据行
-        self._parse_data_rows(ws)
+        # 1. 单遍解析配置行与数据行
+        self._parse_rows(ws)
         
-        # 3. 填充额外信息
+        # 2. 填充额外信息
         data["_config"] = self._var_config
         data["_info"] = self._info
         
-        # 4. 清理状态
+        # 3. 清理状态
         self._clear()
 
 
@@ -4,6 +4,8 @@ from typing import Callable
 from openpyxl.worksheet.worksheet import Worksheet
 from enum import Enum, auto, StrEnum
 
+from .sheet_table import SheetTable
+
 
 class SheetType(Enum):
     COMMON = auto()
@@ -18,6 +20,15 @@ class SheetConfig(StrEnum):
     TYPE  = "!type"  # 类型行
     LABEL = "!label" # 标签行
     PARAM = "!param" # 参数行, 参数列表
+    INDEX = "!index" # 索引行, 填写索引名, 同名的列组成多列索引
+
+class RowType(Enum):
+    """ 行分类
+    """
+    EMPTY   = auto() # 空行
+    COMMENT = auto() # 注释行, # 开头
+    CONFIG  = auto() # 配置行, ! 开头
+    DATA    = auto() # 数据行
 
 class ParserMeta(type):
     """ 解析器元类, 注册派生解析器到基类 _reg_parsers_cls
@@ -43,6 +54,9 @@ class Parser(metaclass=ParserMeta):
     _parsers: dict[str, Parser] = {} # 单例
     
     matcher: set[str] = set() # 列出的 sheet 将使用该解析器
+    compact: bool = False # 紧凑存储, 行数据只保留原生值, 由 Exportor 设置
+    
+    _cfg_names: list[str] = [] # 支持的配置行
     
     
     def _clean_row_data(self, row: tuple) -> tuple:
@@ -51,6 +65,64 @@ class Parser(metaclass=ParserMeta):
         """
         return tuple(None if (isinstance(c, str) and not c.strip()) else c for c in row)
 
+    def _classify_row(self, row: tuple) -> RowType:
+        """ 行分类, row 需已清理
+        """
+        if not any(row):
+            return RowType.EMPTY
+        
+        row_0 = row[0]
+        if isinstance(row_0, str):
+            if row_0.startswith("#"):
+                return RowType.COMMENT
+            
+            if row_0.startswith("!"):
+                return RowType.CONFIG
+        
+        return RowType.DATA
+
+    def _parse_rows(self, ws: Worksheet):
+        """ 单遍解析所有行
+            开头连续的配置行 (跳过空行与注释行) 为配置区, 遇到首个非配置行结束
+            配置区之后的配置行被忽略
+        """
+        in_config = True
+        for r, row in enumerate(ws.iter_rows(values_only=True)):
+            row = self._clean_row_data(row)
+            row_type = self._classify_row(row)
+            
+            if row_type is RowType.EMPTY or row_type is RowType.COMMENT:
+                continue
+            
+            if in_config:
+                if row_type is RowType.CONFIG and row[0] in self._cfg_names:
+                    self._parse_config(r, row)
+                    continue
+                
+                in_config = False
+                self._end_config(ws)
+
+            if row_type is RowType.DATA:
+                self._parse_data(r, row)
+        
+        if in_config:
+            self._end_config(ws)
+
+    def _parse_config(self, r: int, row: tuple):
+        """ 解析配置行
+        """
+        pass
+
+    def _end_config(self, ws: Worksheet):
+        """ 配置区结束时调用, 子类可在此校验配置
+        """
+        pass
+
+    def _parse_data(self, r: int, row: tuple):
+        """ 解析数据行
+        """
+        pass
+
     
     # --------------------------------------------------------------------------------
     
@@ -102,6 +174,38 @@ class Parser(metaclass=ParserMeta):
         """ 解析 sheet
         """
         raise NotImplementedError("子类必须实现 parse 方法")
+    
+    def to_table(self, sheet_name: str, data: dict) -> SheetTable:
+        """ 转为写入器使用的列式中间表示, 默认整体保存为 value
+        """
+        value = { k: v for k, v in data.items() if not (isinstance(k, str) and k.startswith("_")) }
+        return SheetTable(sheet_name, "value", data["_info"], data.get("_config", None), value=value)
+
+    def _merge_rows(self, data: dict, new_data: dict, depth: int, title: str):
+        """ 按层级合并行数据, 最后一层直接覆盖
+        """
+        for k, v in new_data.items():
+            if depth > 1 and k in data:
+                self._merge_rows(data[k], v, depth - 1, title)
+                continue
+            
+            if k in data:
+                print(f"[konfi] 警告: {title} 键 {k} 已存在, 发生配置覆盖")
+            
+            data[k] = v
+
+    def merge(self, data: dict, new_data: dict) -> None:
+        """ 把另一份同名 sheet 的解析结果合并进 data
+            与在 data 上直接 parse 的结果一致, 以 _ 开头的信息以新数据为准
+        """
+        rows = { k: v for k, v in new_data.items() if not (isinstance(k, str) and k.startswith("_")) }
+        depth = len(new_data.get("_primary") or ()) or 1 # 有主键时按主键层级合并
+        title = new_data.get("_info", {}).get("title", None)
+        self._merge_rows(data, rows, depth, title)
+        
+        for k, v in new_data.items():
+            if isinstance(k, str) and k.startswith("_"):
+                data[k] = v
         
         
         
\ No newline at end of file
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterator
+
+from ..etypes import EType, EInt, EFloat, ETypeConverter
+
+
+class SheetTable:
+    """ sheet 的列式中间表示, 由解析器产出, 写入器消费
+        kind     rows: 按主键组织的行数据, kv: 键值表, value: 其他 (枚举表等) 数据保存在 value
+        schema   { var: 转换器 } 各列类型, 为 None 的列直接保存 EType
+        columns  { var: 列数据 } 原生值, 非空的 int / float 列为 array
+                 boxed 为 True 时 (非紧凑解析) 直接保存解析出的 EType, 避免拆箱再包装
+        keys     各行主键原生值, 单主键为值, 多主键为元组
+        index    { 主键: 行号 }
+        indexes  二级索引 { 索引名: { 索引列值: ... [主键] } }, 原生值
+    """
+    __slots__ = ("name", "kind", "info", "config", "primary", "schema", "columns", "boxed", "keys", "index", "indexes", "value")
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        info: dict,
+        config: dict=None,
+        primary: list[str]=None,
+        schema: dict[str, ETypeConverter | None]=None,
+        columns: dict[str, list | array]=None,
+        indexes: dict[str, dict]=None,
+        value: Any=None,
+        boxed: bool=False,
+    ):
+        self.name = name
+        self.kind = kind
+        self.info = info
+        self.config = config
+        self.primary = primary or []
+        self.schema = schema or {}
+        self.columns = columns or {}
+        self.indexes = indexes or {}
+        self.value = value
+        self.boxed = boxed
+
+        if self.primary:
+            key_cols = [self.native(key) for key in self.primary]
+            self.keys = list(key_cols[0] if len(key_cols) == 1 else zip(*key_cols))
+        else:
+            self.keys = []
+
+        self.index = { k: r for r, k in enumerate(self.keys) }
+
+    @staticmethod
+    def pack_column(conv: ETypeConverter | None, values: list) -> list | array:
+        """ 非空的 int / float 列存为 array, 其余保持列表
+        """
+        if conv is None or conv.nullable:
+            return values
+
+        try:
+            if conv.etype_cls is EInt:
+                return array("q", values)
+            if conv.etype_cls is EFloat:
+                return array("d", values)
+
+        except (TypeError, OverflowError):
+            pass
+
+        return values
+
+    @classmethod
+    def from_rows(
+        cls,
+        name: str,
+        info: dict,
+        config: dict,
+        primary: list[str],
+        schema: dict[str, ETypeConverter],
+        rows: list[dict],
+        compact: bool,
+        indexes: dict[str, dict]=None,
+    ) -> SheetTable:
+        """ 由按主键展开的行数据构建, 紧凑的行数据按列打包, 非紧凑的保留 EType, 索引统一为原生值
+        """
+        columns = {}
+        for var, conv in schema.items():
+            values = [row.get(var, None) for row in rows]
+            columns[var] = cls.pack_column(conv, values) if compact else values
+
+        if indexes and not compact:
+            def unbox(node: dict | list) -> dict | list:
+                if isinstance(node, list):
+                    return [[k.unbox() for k in pk] if isinstance(pk, list) else pk.unbox() for pk in node]
+                return { k.unbox(): unbox(v) for k, v in node.items() }
+
+            indexes = { index_name: unbox(node) for index_name, node in indexes.items() }
+
+        return cls(name, "rows", info, config, primary, schema, columns, indexes, boxed=not compact)
+
+    # -----------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def etype(self, var: str, r: int) -> EType:
+        """ 第 r 行 var 列的 EType
+        """
+        conv = self.schema[var]
+        val = self.columns[var][r]
+        return val if conv is None or self.boxed else conv.box(val)
+
+    def native(self, var: str) -> list | array:
+        """ var 列的原生值
+        """
+        col = self.columns[var]
+        if self.boxed or self.schema.get(var, None) is None:
+            return [None if etype is None else etype.unbox() for etype in col]
+        
+        return col
+
+    def row(self, r: int) -> dict[str, EType]:
+        return { var: self.etype(var, r) for var in self.columns }
+
+    def rows(self) -> Iterator[dict[str, EType]]:
+        """ 按行遍历, 值为 EType
+        """
+        var_list = list(self.columns)
+        if self.boxed:
+            for vals in zip(*self.columns.values()):
+                yield dict(zip(var_list, vals))
+            return
+
+        convs = [self.schema[var] for var in var_list]
+        for vals in zip(*self.columns.values()):
+            yield { var: val if conv is None else conv.box(val) for var, conv, val in zip(var_list, convs, vals) }
+
+    def to_dict(self) -> dict:
+        """ 还原为解析器原先的嵌套字典, 值为 EType
+            rows: { 主键1: ... { 主键n: { var: EType } } }, kv: { 键: 值 }, value: 原数据
+        """
+        if self.kind == "value":
+            return self.value
+
+        if self.kind == "kv":
+            return dict(zip(self.columns["key"], self.columns["val"]))
+
+        res = {}
+        last = len(self.primary) - 1
+        for row in self.rows():
+            data = res
+            for idx, key in enumerate(self.primary):
+                k = row[key]
+                if idx == last:
+                    data[k] = row
+                else:
+                    data = data.setdefault(k, {})
+
+        return res
+
+    def etype_indexes(self) -> dict[str, dict]:
+        """ 二级索引, 索引值与主键还原为 EType
+        """
+        pk_convs = [self.schema[key] for key in self.primary]
+
+        def box_pk(pk):
+            if len(pk_convs) == 1:
+                return pk_convs[0].box(pk)
+            return [conv.box(k) for conv, k in zip(pk_convs, pk)]
+
+        def expand(node: dict | list, convs: list) -> dict | list:
+            if not convs: # 主键列表
+                return [box_pk(pk) for pk in node]
+            return { convs[0].box(k): expand(v, convs[1:]) for k, v in node.items() }
+
+        return { name: expand(node, [self.schema[var] for var in self.info["indexes"][name]]) for name, node in self.indexes.items() }
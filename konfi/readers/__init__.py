@@ -0,0 +1,4 @@
+from .reader import Reader
+from .openpyxl_reader import OpenpyxlReader
+from .stream_reader import StreamReader, StreamSheet
+from .xlsx_reader import XlsxReader, XlsxSheet
@@ -0,0 +1,38 @@
+
+from pathlib import Path
+from typing import Callable, Iterator
+
+from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.workbook.workbook import Workbook
+
+from .reader import Reader
+from .stream_reader import load_workbook
+
+
+class OpenpyxlReader(Reader):
+    """ openpyxl 完整加载读取器
+        一次性构建所有单元格对象, 内存占用高, 保留用于兼容
+    """
+    name = "openpyxl"
+    
+    def _proc_mergedcell(self, ws: Worksheet):
+        """ 处理合并单元格, 否则被合并的单元格值为 None
+        """
+        for cr in ws.merged_cells.ranges:
+            min_c, min_r, max_c, max_r = cr.bounds
+            top_left = ws.cell(min_r, min_c)
+            for r in range(min_r, max_r + 1):
+                for c in range(min_c, max_c + 1):
+                    if r != min_r or c != min_c:
+                        ws._cells[(r, c)] = top_left
+
+    def read(self, table_path: Path, select: Callable[[str], bool]=None) -> Iterator[Worksheet]:
+        wb: Workbook = load_workbook(table_path, False, select)
+        if wb is None:
+            return
+        
+        for ws in wb.worksheets:
+            if not ws.title.startswith("#"): # 被注释的 sheet 无需处理合并单元格
+                self._proc_mergedcell(ws)
+            
+            yield ws
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, IO, Iterable, Iterator
+import re
+
+from openpyxl.utils.cell import range_boundaries
+
+
+_merge_re = re.compile(rb'<(?:\w+:)?mergeCell\b[^>]*?\bref="([^"]+)"')
+_chunk_size = 1 << 20
+
+def read_merged_ranges(src: IO[bytes]) -> dict[int, list[tuple[int, int, int, int]]]:
+    """ 扫描 sheet xml 中的合并区域, 返回 { min_r: [(min_c, min_r, max_c, max_r)] }
+        只做字节级匹配, 不构建 xml 元素
+    """
+    merged = {}
+    tail = b""
+    while chunk := src.read(_chunk_size):
+        buf = tail + chunk
+        end = 0
+        for m in _merge_re.finditer(buf):
+            bounds = range_boundaries(m.group(1).decode("ascii"))
+            merged.setdefault(bounds[1], []).append(bounds)
+            end = m.end()
+        
+        # 保留末尾可能被截断的标签
+        idx = buf.rfind(b"<", end)
+        tail = buf[idx:] if idx != -1 else b""
+    
+    return merged
+
+def fill_merged(rows: Iterable[tuple], merged: dict[int, list[tuple[int, int, int, int]]]) -> Iterator[tuple]:
+    """ 逐行填充合并单元格, 合并区域内的单元格取左上角的值
+    """
+    active: list[tuple[int, int, int, int, Any]] = [] # 生效中的合并区域 (min_c, min_r, max_c, max_r, val)
+    for r, row in enumerate(rows, 1):
+        if r in merged:
+            for min_c, min_r, max_c, max_r in merged[r]:
+                val = row[min_c - 1] if min_c <= len(row) else None
+                active.append((min_c, min_r, max_c, max_r, val))
+        
+        if not active:
+            yield row
+            continue
+        
+        row = list(row)
+        for min_c, min_r, max_c, max_r, val in active:
+            if len(row) < max_c:
+                row.extend([None] * (max_c - len(row)))
+            
+            for c in range(min_c - 1, max_c):
+                row[c] = val
+        
+        active = [a for a in active if a[3] > r]
+        yield tuple(row)
+
+
+class ReaderMeta(type):
+    """ 读取器元类, 注册派生读取器到基类 _reg_readers_cls
+    """
+    
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+
+        if "_reg_readers_cls" in namespace:
+            return
+
+        for base in bases:
+            if hasattr(base, "_reg_readers_cls"):
+                base._reg_readers_cls[cls.name] = cls
+                break
+
+
+class Reader(metaclass=ReaderMeta):
+    """ 表格读取器, 负责把 workbook 读取为一组 sheet
+        sheet 需提供 title 属性与 iter_rows(values_only=True) 方法, 合并单元格需已填充
+    """
+    name = "" # 读取器名
+    
+    _reg_readers_cls: dict[str, type[Reader]] = {}
+    _readers: dict[str, Reader] = {} # 单例
+    
+
+    @classmethod
+    def get_reader(cls, name: str) -> Reader:
+        if name in cls._readers:
+            return cls._readers[name]
+        
+        reader_cls = cls._reg_readers_cls.get(name, None)
+        if reader_cls:
+            reader = reader_cls()
+            cls._readers[name] = reader
+            return reader
+            
+        else:
+            raise ValueError(f"Reader {name} 未找到")
+
+
+    def read(self, table_path: Path, select: Callable[[str], bool]=None) -> Iterator[Any]:
+        """ 依次产出 workbook 中的 sheet
+            select 不为空时只产出标题满足条件的 sheet, 在解码 sheet 前按 workbook 元数据判断
+        """
+        raise NotImplementedError("子类必须实现 read 方法")
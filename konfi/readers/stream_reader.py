@@ -0,0 +1,91 @@
+
+from pathlib import Path
+from typing import Callable, Iterator
+
+import openpyxl as xl
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+from .reader import Reader, read_merged_ranges, fill_merged
+from .xlsx_reader import read_sheet_titles
+
+
+class _SelectiveExcelReader(ExcelReader):
+    """ 只创建被选中的 sheet, 其余 sheet 的 xml 不会被打开
+    """
+    
+    def __init__(self, filename: Path, select: Callable[[str], bool], **kwargs):
+        super().__init__(filename, **kwargs)
+        self._select = select
+    
+    def read_worksheets(self):
+        find_sheets = self.parser.find_sheets
+        self.parser.find_sheets = lambda: ((sheet, rel) for sheet, rel in find_sheets() if self._select(sheet.name))
+        super().read_worksheets()
+
+
+def load_workbook(table_path: Path, read_only: bool, select: Callable[[str], bool]=None) -> Workbook | None:
+    """ 加载 workbook, 只包含 select 选中的 sheet
+        没有选中任何 sheet 时不加载, 返回 None
+    """
+    if select is None:
+        return xl.load_workbook(filename=table_path, read_only=read_only, data_only=True)
+    
+    if not any(select(title) for title in read_sheet_titles(table_path)):
+        return None
+    
+    reader = _SelectiveExcelReader(table_path, select, read_only=read_only, data_only=True)
+    reader.read()
+    return reader.wb
+
+
+class StreamSheet:
+    """ 流式 sheet, 逐行解码, 合并单元格在产出行时即时填充
+        只读模式默认以 <dimension> 截断行与列, 该标记可能未随内容更新 (由其他工具生成)
+        因此清除尺寸读到 <sheetData> 结束, <dimension> 只用于补齐行宽
+    """
+    
+    def __init__(self, ws: ReadOnlyWorksheet):
+        self._ws = ws
+        self.title: str = ws.title
+        self._width: int = ws.max_column or 0 # <dimension> 的列数
+        self._merged: dict[int, list[tuple[int, int, int, int]]] = None # { min_r: [(min_c, min_r, max_c, max_r)] }
+        
+        ws.reset_dimensions()
+    
+    def _pad_rows(self, rows: Iterator[tuple]) -> Iterator[tuple]:
+        width = self._width
+        for row in rows:
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            
+            yield row
+    
+    def iter_rows(self, values_only: bool=True) -> Iterator[tuple]:
+        if not values_only:
+            raise ValueError("StreamSheet 只支持 values_only")
+        
+        if self._merged is None:
+            with self._ws._get_source() as src:
+                self._merged = read_merged_ranges(src)
+        
+        yield from fill_merged(self._pad_rows(self._ws.iter_rows(values_only=True)), self._merged)
+
+
+class StreamReader(Reader):
+    """ 流式读取器
+        基于 openpyxl 只读模式, 行在解码的同时交给解析器
+    """
+    name = "stream"
+    
+    def read(self, table_path: Path, select: Callable[[str], bool]=None) -> Iterator[StreamSheet]:
+        wb = load_workbook(table_path, True, select)
+        if wb is None:
+            return
+        
+        try:
+            for ws in wb.worksheets:
+                yield StreamSheet(ws)
+        finally:
+            wb.close()
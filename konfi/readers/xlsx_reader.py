@@ -0,0 +1,309 @@
+
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Iterator
+import xml.etree.ElementTree as ET
+import zipfile
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+from .reader import Reader, read_merged_ranges, fill_merged
+
+
+_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DOC_REL_ATTRS = ( # r:id 属性, 兼容 strict 格式
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id",
+    "{http://purl.oclc.org/ooxml/officeDocument/relationships}id",
+)
+
+
+def _root_ns(data: bytes) -> str:
+    """ 根元素的命名空间 "{...}", 兼容 transitional 与 strict 格式
+    """
+    parser = ET.XMLPullParser(("start",))
+    parser.feed(data[:4096])
+    for _, el in parser.read_events():
+        tag = el.tag
+        return tag[:tag.index("}") + 1] if tag.startswith("{") else ""
+
+    return ""
+
+def _text(el: ET.Element | None, ns: str) -> str | None:
+    """ 字符串元素的文本, 拼接 <t> 与富文本 <r><t>, 忽略注音 <rPh>
+    """
+    if el is None:
+        return None
+
+    t = el.find(f"{ns}t")
+    if t is not None:
+        return t.text or ""
+
+    return "".join(t.text or "" for t in el.iterfind(f"{ns}r/{ns}t"))
+
+
+class XlsxWorkbook:
+    """ 直接读取 xlsx 压缩包, 只解析单元格值需要的部分
+        workbook.xml: sheet 列表与日期基准, sharedStrings.xml: 共享字符串, styles.xml: 只读取日期格式
+        打开时只读取 workbook.xml, 共享字符串与样式在首次解码 sheet 时读取
+    """
+
+    def __init__(self, path: Path):
+        self._zip = zipfile.ZipFile(path)
+        self._names = set(self._zip.namelist())
+
+        wb_path = self._office_document()
+        wb_data = self._zip.read(wb_path)
+        wb_ns = _root_ns(wb_data)
+        wb_root = ET.fromstring(wb_data)
+        rels = self._rels(wb_path)
+
+        pr = wb_root.find(f"{wb_ns}workbookPr")
+        self.epoch = CALENDAR_MAC_1904 if pr is not None and pr.get("date1904") in ("1", "true") else CALENDAR_WINDOWS_1900
+
+        # 只保留工作表, 忽略图表页
+        self.sheets: list[tuple[str, str]] = [] # [(标题, xml 路径)]
+        for el in wb_root.iterfind(f"{wb_ns}sheets/{wb_ns}sheet"):
+            rid = next((el.get(attr) for attr in _DOC_REL_ATTRS if el.get(attr)), None)
+            rel_type, target = rels.get(rid, ("", None))
+            if target and rel_type.endswith("/worksheet"):
+                self.sheets.append((el.get("name"), target))
+
+        self._targets = { rel_type.rpartition("/")[2]: target for rel_type, target in rels.values() }
+        self.shared_strings: list[str] = None
+        self.date_styles: set[str] = None
+        self.timedelta_styles: set[str] = None
+
+    def load_cell_data(self):
+        """ 读取解码单元格所需的共享字符串与日期样式
+        """
+        if self.shared_strings is None:
+            self.shared_strings = self._read_shared_strings(self._targets.get("sharedStrings", None))
+            self.date_styles, self.timedelta_styles = self._read_date_styles(self._targets.get("styles", None))
+
+    def close(self):
+        self._zip.close()
+
+    def open(self, name: str):
+        return self._zip.open(name)
+
+    def _office_document(self) -> str:
+        for rel_type, target in self._rels("").values():
+            if rel_type.endswith("/officeDocument"):
+                return target
+
+        return "xl/workbook.xml"
+
+    def _rels(self, part: str) -> dict[str, tuple[str, str]]:
+        """ 读取部件的关系 { Id: (Type, 目标路径) }
+        """
+        part = PurePosixPath(part)
+        rels_path = (part.parent / "_rels" / f"{part.name}.rels").as_posix()
+        if rels_path not in self._names:
+            return {}
+
+        rels = {}
+        for el in ET.fromstring(self._zip.read(rels_path)).iter(f"{_REL_NS}Relationship"):
+            target = el.get("Target", "")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = (part.parent / target).as_posix()
+
+            # 规范化 ../
+            parts = []
+            for seg in target.split("/"):
+                if seg == "..":
+                    parts and parts.pop()
+                elif seg and seg != ".":
+                    parts.append(seg)
+
+            rels[el.get("Id")] = (el.get("Type", ""), "/".join(parts))
+
+        return rels
+
+    def _read_shared_strings(self, path: str | None) -> list[str]:
+        if not path or path not in self._names:
+            return []
+
+        strings = []
+        with self._zip.open(path) as src:
+            ns = None
+            for _, el in ET.iterparse(src, events=("end",)):
+                if ns is None:
+                    tag = el.tag
+                    ns = tag[:tag.index("}") + 1] if tag.startswith("{") else ""
+
+                if el.tag == f"{ns}si":
+                    strings.append(_text(el, ns).replace("x005F_", "")) # 与 openpyxl 一致
+                    el.clear()
+
+        return strings
+
+    def _read_date_styles(self, path: str | None) -> tuple[set[str], set[str]]:
+        """ 数字格式为日期 / 时长的单元格样式序号, 其余样式信息不解析
+        """
+        if not path or path not in self._names:
+            return set(), set()
+
+        data = self._zip.read(path)
+        ns = _root_ns(data)
+        root = ET.fromstring(data)
+
+        custom = { el.get("numFmtId"): el.get("formatCode") for el in root.iterfind(f"{ns}numFmts/{ns}numFmt") }
+        date_styles, timedelta_styles = set(), set()
+        for idx, xf in enumerate(root.iterfind(f"{ns}cellXfs/{ns}xf")):
+            num_fmt_id = xf.get("numFmtId", "0")
+            fmt = custom[num_fmt_id] if num_fmt_id in custom else BUILTIN_FORMATS.get(int(num_fmt_id), None)
+            if fmt is None:
+                continue
+
+            if is_date_format(fmt):
+                date_styles.add(str(idx))
+            if is_timedelta_format(fmt):
+                timedelta_styles.add(str(idx))
+
+        return date_styles, timedelta_styles
+
+
+class XlsxSheet:
+    """ 轻量 sheet, 增量解析 <c> 的值, 产出与 openpyxl 只读模式一致的行
+        <dimension> 只用于补齐行宽, 行数与行宽以实际的 <row r> / <c r> 为准, 合并单元格在产出行时即时填充
+    """
+
+    def __init__(self, wb: XlsxWorkbook, title: str, path: str):
+        self._wb = wb
+        self._path = path
+        self.title: str = title
+
+    def _cell_value(self, c: ET.Element, ns: str) -> Any:
+        t = c.get("t")
+        if t == "inlineStr":
+            return _text(c.find(f"{ns}is"), ns)
+
+        v = c.findtext(f"{ns}v") or None
+        if v is None:
+            return None
+
+        if t is None or t == "n":
+            val = float(v) if "." in v or "E" in v or "e" in v else int(v)
+            s = c.get("s")
+            if s is not None and s in self._wb.date_styles:
+                try:
+                    val = from_excel(val, self._wb.epoch, timedelta=s in self._wb.timedelta_styles)
+                except (OverflowError, ValueError):
+                    val = "#VALUE!"
+
+            return val
+
+        if t == "s":
+            return self._wb.shared_strings[int(v)]
+        if t == "b":
+            return bool(int(v))
+        if t == "d":
+            return from_ISO8601(v)
+
+        return v # str: 公式结果字符串, e: 错误值
+
+    def _iter_values(self) -> Iterator[tuple]:
+        """ 逐行产出单元格值, 补齐缺失的行与单元格
+            <dimension> 可能未随内容更新 (由其他工具生成), 超出范围的行与单元格照常产出
+        """
+        self._wb.load_cell_data()
+        with self._wb.open(self._path) as src:
+            ns = _root_ns(src.read(4096))
+
+        ROW, C, DIMENSION = f"{ns}row", f"{ns}c", f"{ns}dimension"
+        col_index: dict[str, int] = {} # { 列字母: 列号 }
+        cell_value = self._cell_value
+
+        max_col = 0
+        empty_row = ()
+        row_counter = 0
+        counter = 1 # 下一个产出的行号
+        with self._wb.open(self._path) as src:
+            for _, el in ET.iterparse(src, events=("end",)):
+                tag = el.tag
+                if tag != ROW:
+                    if tag == DIMENSION and el.get("ref"): # <dimension> 在 <sheetData> 之前
+                        max_col = range_boundaries(el.get("ref"))[2] or 0
+                        empty_row = (None,) * max_col
+                    continue
+
+                r = el.get("r")
+                row_counter = int(float(r)) if r is not None else row_counter + 1
+
+                cells = []
+                col_counter = 0
+                width = max_col # 行宽, 单元格超出 <dimension> 时加宽
+                for c in el:
+                    if c.tag != C:
+                        continue
+
+                    ref = c.get("r")
+                    if ref is None:
+                        col_counter += 1
+                    else:
+                        letters = ref.rstrip("0123456789")
+                        col_counter = col_index.get(letters, 0)
+                        if not col_counter:
+                            col_counter = col_index[letters] = column_index_from_string(letters)
+
+                    cells.append((col_counter, cell_value(c, ns)))
+                    if col_counter > width:
+                        width = col_counter
+
+                el.clear()
+
+                while counter < row_counter: # 缺失的行
+                    counter += 1
+                    yield empty_row
+
+                if counter > row_counter:
+                    continue
+
+                counter += 1
+                if not width:
+                    yield ()
+                    continue
+
+                row = [None] * width
+                for col, val in cells:
+                    row[col - 1] = val
+
+                yield tuple(row)
+
+    def iter_rows(self, values_only: bool=True) -> Iterator[tuple]:
+        if not values_only:
+            raise ValueError("XlsxSheet 只支持 values_only")
+
+        with self._wb.open(self._path) as src:
+            merged = read_merged_ranges(src)
+
+        yield from fill_merged(self._iter_values(), merged)
+
+
+class XlsxReader(Reader):
+    """ 轻量 xlsx 读取器
+        不经过 openpyxl 的工作簿模型, 直接从压缩包解析单元格值, 不构建样式与单元格对象
+    """
+    name = "xlsx"
+
+    def read(self, table_path: Path, select: Callable[[str], bool]=None) -> Iterator[XlsxSheet]:
+        wb = XlsxWorkbook(table_path)
+        try:
+            for title, path in wb.sheets:
+                if select is None or select(title):
+                    yield XlsxSheet(wb, title, path)
+        finally:
+            wb.close()
+
+
+def read_sheet_titles(table_path: Path) -> list[str]:
+    """ 只读取 workbook.xml 得到工作表标题
+    """
+    wb = XlsxWorkbook(table_path)
+    try:
+        return [title for title, _ in wb.sheets]
+    finally:
+        wb.close()
@@ -1,5 +1,7 @@
-from .writer import Writer
+from .writer import Writer, write_targets
 from .py_writer import PyWriter
 from .json_writer import JsonWriter
 from .lua_writer import LuaWriter
+from .kbin_writer import KbinWriter, KbinPacker
 
+from .string_table import StringTable
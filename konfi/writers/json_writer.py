@@ -1,15 +1,22 @@
 
 from pathlib import Path
-import json
+from json.encoder import encode_basestring
+from typing import Any
+import io
 
 from .writer import Writer
+from .string_table import StringTable
 from ..etypes import *
-from ..parsers import SheetType
+from ..parsers import SheetTable
 
 class JsonWriter(Writer):
     """ json 写入器
+        string_table 时字符串值输出为 strings.json 中的序号 (从 0 开始)
     """
     ext = "json"
+    options = Writer.options + ("indent", "flush_size")
+    indent = 4 # 缩进空格数, None 时输出紧凑格式
+    flush_size = 8192 # 缓冲片段数, 超过后写入文件
     
     def _serializer(self, obj, is_key=False):
         match obj:
@@ -30,56 +37,202 @@ class JsonWriter(Writer):
 
         return str(obj) if is_key else obj
 
-    
-    def write(
-        self, 
-        data: dict[str, dict],
-        data_path: Path,
-    ) -> None:
-
-        config_path = data_path / "config"
-        enum_path = data_path / "enum"
-        
-        config_path.mkdir(parents=True, exist_ok=True)
-        enum_path.mkdir(parents=True, exist_ok=True)
-        
-        # 辅助
-        enum_sheets = []
-        modules: list[str] = []
+    # ----------------------- 流式编码 ---------------------------------
+
+    def _float(self, val: float) -> str:
+        if val != val:
+            return "NaN"
+        if val in (float("inf"), float("-inf")):
+            return "Infinity" if val > 0 else "-Infinity"
+        return float.__repr__(val)
+
+    def _key(self, key: Any) -> str:
+        """ 键转为 json 字符串, EType 键与原 _serializer 一致, 其余按 json 规则
+        """
+        match key:
+            case EType():
+                return encode_basestring(self._serializer(key, True))
+            case str():
+                return encode_basestring(key)
+            case bool():
+                return '"true"' if key else '"false"'
+            case int():
+                return f'"{int.__repr__(key)}"'
+            case float():
+                return f'"{self._float(key)}"'
+            case None:
+                return '"null"'
         
-        for sheet_name, sheet_data in data.items():
-            config = sheet_data.pop("_config", None)
-            primary = sheet_data.pop("_primary", None)
-            info = sheet_data.pop("_info", None)
-            table_sheet = f"{info['table_path'].name}/{info['title']}"
-            
-            sheet_type = info["sheet_type"]
-            is_enum_sheet = sheet_type == SheetType.ENUM
-            is_kv_sheet = sheet_type == SheetType.KV
-            path = is_enum_sheet and enum_path or config_path
-
-            # 模块
-            module = info.get("module", None)
-            if module:
-                path = path / module
-                path.mkdir(parents=True, exist_ok=True)
-                
-                modules.append(module)
-            
-            # 处理 etype key 
-            for k in list(sheet_data.keys()):
-                sheet_data[self._serializer(k, True)] = sheet_data.pop(k)
+        raise TypeError(f"json 键类型不支持 {type(key).__name__}")
+
+    def _encode_items(self, items, chunks: list[str], depth: int, left: str, right: str, is_dict: bool):
+        """ 编码容器, items 为 [(键, 值)] 或 [值]
+        """
+        first = True
+        if self.indent is None:
+            item_sep, key_sep, end = ",", ":", right
+        else:
+            newline = "\n" + " " * (self.indent * (depth + 1))
+            item_sep, key_sep, end = "," + newline, ": ", "\n" + " " * (self.indent * depth) + right
+
+        for item in items:
+            if first:
+                chunks.append(left if self.indent is None else left + newline)
+                first = False
+            else:
+                chunks.append(item_sep)
             
-            file_path = path / f"{sheet_name}.{self.ext}"
-            with file_path.open("w", encoding="utf-8") as f:
-                json.dump(
-                    sheet_data,
-                    f,
-                    ensure_ascii=False, 
-                    indent=4, 
-                    default=self._serializer
-                )
+            if is_dict:
+                chunks.append(self._key(item[0]))
+                chunks.append(key_sep)
+                self._encode(item[1], chunks, depth + 1)
+            else:
+                self._encode(item, chunks, depth + 1)
+
+        chunks.append(left + right if first else end)
+
+    def _encode(self, obj: Any, chunks: list[str], depth: int):
+        """ 遍历 EType 树, 编码结果追加到 chunks
+        """
+        match obj:
+            case str():
+                chunks.append(encode_basestring(obj))
+            case None:
+                chunks.append("null")
+            case bool():
+                chunks.append("true" if obj else "false")
+            case int():
+                chunks.append(int.__repr__(obj))
+            case float():
+                chunks.append(self._float(obj))
+            case EString() if self._strings is not None and obj.py_val is not None: # 共享字符串表序号
+                chunks.append(int.__repr__(self._strings.ref(obj.py_val)))
+            case EEnumVal():
+                self._encode(obj.enum_val, chunks, depth)
+            case EDictM() | EDict():
+                self._encode_items(obj.py_val.items(), chunks, depth, "{", "}", True)
+            case EListM() | EList():
+                self._encode_items(obj.py_val, chunks, depth, "[", "]", False)
+            case ESetM() | ESet():
+                self._encode_items(((self._serializer(v), True) for v in obj.py_val), chunks, depth, "{", "}", True)
+            case EEnum():
+                self._encode(obj.enum_dict_name, chunks, depth)
+            case EType():
+                self._encode(obj.py_val, chunks, depth)
+            case EnumPack():
+                self._encode(obj.val, chunks, depth)
+            case dict():
+                self._encode_items(obj.items(), chunks, depth, "{", "}", True)
+            case list() | tuple():
+                self._encode_items(obj, chunks, depth, "[", "]", False)
+            case _:
+                raise TypeError(f"json 值类型不支持 {type(obj).__name__}")
+
+    def _dump(self, sheet_data: dict, f):
+        """ 逐条编码 sheet 顶层数据并分段写入文件
+        """
+        if not sheet_data:
+            f.write("{}")
+            return
+
+        chunks = []
+        if self.indent is None:
+            left, item_sep, key_sep, end = "{", ",", ":", "}"
+        else:
+            newline = "\n" + " " * self.indent
+            left, item_sep, key_sep, end = "{" + newline, "," + newline, ": ", "\n}"
+
+        for i, (k, v) in enumerate(sheet_data.items()):
+            chunks.append(item_sep if i else left)
+            chunks.append(self._key(k))
+            chunks.append(key_sep)
+            self._encode(v, chunks, 1)
+
+            if len(chunks) > self.flush_size:
+                f.write("".join(chunks))
+                chunks.clear()
+
+        chunks.append(end)
+        f.write("".join(chunks))
+
+    def _dump_rows(self, table: SheetTable, f):
+        """ 单主键数据表按列编码, int / float / bool / string 列直接编码原生值, 不再包装为 EType
+        """
+        if not len(table):
+            f.write("{}")
+            return
+
+        if self.indent is None:
+            left, item_sep, key_sep, end = "{", ",", ":", "}"
+            row_left, row_sep, row_end = "{", ",", "}"
+        else:
+            pad = " " * self.indent
+            left, item_sep, key_sep, end = "{\n" + pad, ",\n" + pad, ": ", "\n}"
+            row_left, row_sep, row_end = "{\n" + pad * 2, ",\n" + pad * 2, "\n" + pad + "}"
+
+        native = (EInt, EFloat, EBool, EString)
+        cols = [] # [(编码后的键, 列, 原生类型列, 需要包装时的转换器, 输出字符串表序号)]
+        for var, col in table.columns.items():
+            conv = table.schema[var]
+            is_native = conv is not None and conv.etype_cls in native
+            box_conv = None if table.boxed or conv is None or is_native else conv
+            str_ref = self._strings is not None and conv is not None and conv.etype_cls is EString
+            cols.append((self._key(var) + key_sep, col, is_native and table.boxed, box_conv, str_ref))
+
+        key_conv = table.schema[table.primary[0]]
+        key_native = key_conv is not None and key_conv.etype_cls in native
+
+        chunks = []
+        for r, k in enumerate(table.keys):
+            chunks.append(item_sep if r else left)
+            chunks.append(encode_basestring(str(k)) if key_native else self._key(key_conv.box(k) if key_conv else k))
+            chunks.append(key_sep)
+
+            if not cols:
+                chunks.append("{}")
+                continue
+
+            for i, (name, col, unbox, conv, str_ref) in enumerate(cols):
+                chunks.append(row_sep if i else row_left)
+                chunks.append(name)
+                val = col[r]
+                if unbox and val is not None: # 原生类型的 EType 直接取值
+                    val = val.py_val
+                elif conv is not None:
+                    val = conv.box(val)
+                if str_ref and val is not None:
+                    val = self._strings.ref(val)
+                self._encode(val, chunks, 2)
+            chunks.append(row_end)
+
+            if len(chunks) > self.flush_size:
+                f.write("".join(chunks))
+                chunks.clear()
+
+        chunks.append(end)
+        f.write("".join(chunks))
+
+    # -----------------------------------------------------------------
+    
+    def _render_strings(self, strings: StringTable, data_path: Path) -> list[tuple[Path, bytes]]:
+        f = io.StringIO()
+        chunks = []
+        self._encode(strings.strings, chunks, 0)
+        f.write("".join(chunks))
+        return [(data_path / f"strings.{self.ext}", self._encode_text(f.getvalue()))]
+
+    def _render(self, sheet_name: str, table: SheetTable, file_path: Path) -> tuple[list[tuple[Path, bytes]], dict[str, float]]:
+        f = io.StringIO()
+        if table.kind == "rows" and len(table.primary) == 1:
+            self._dump_rows(table, f)
+        else:
+            self._dump(table.to_dict(), f)
         
+        files = [(file_path, self._encode_text(f.getvalue()))]
         
+        if table.indexes: # 二级索引写入单独文件
+            f = io.StringIO()
+            self._dump(table.etype_indexes(), f)
+            files.append((file_path.with_name(f"{sheet_name}_index.{self.ext}"), self._encode_text(f.getvalue())))
         
-        
\ No newline at end of file
+        return files, {}
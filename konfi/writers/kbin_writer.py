@@ -0,0 +1,212 @@
+
+from pathlib import Path
+from typing import Any
+from array import array
+import json
+import struct
+import sys
+
+from .writer import Writer
+from ..etypes import *
+from ..parsers import SheetType, SheetTable
+from .. import kbin
+
+
+class KbinPacker:
+    """ 打包一个 sheet 的 kbin 数据: 字符串表, 列数组, 嵌套值
+    """
+
+    def __init__(self):
+        self._strings: dict[str, int] = {} # { 字符串: 索引 }
+        self._blob = bytearray()
+
+    def string(self, s: str) -> int:
+        idx = self._strings.get(s, None)
+        if idx is None:
+            idx = len(self._strings)
+            self._strings[s] = idx
+
+        return idx
+
+    def value(self, val: Any) -> int:
+        """ 打包嵌套值, 返回在 blob 中的偏移
+        """
+        offset = len(self._blob)
+        self._pack(val)
+        return offset
+
+    def _pack(self, val: Any):
+        blob = self._blob
+        match val:
+            case None:
+                blob.append(kbin.T_NONE)
+            case bool():
+                blob.append(kbin.T_TRUE if val else kbin.T_FALSE)
+            case int() if -(1 << 63) <= val < (1 << 63):
+                blob.append(kbin.T_INT)
+                blob += struct.pack("<q", val)
+            case int():
+                blob.append(kbin.T_BIGINT)
+                blob += struct.pack("<I", self.string(str(val)))
+            case float():
+                blob.append(kbin.T_FLOAT)
+                blob += struct.pack("<d", val)
+            case str():
+                blob.append(kbin.T_STR)
+                blob += struct.pack("<I", self.string(val))
+            case dict():
+                blob.append(kbin.T_DICT)
+                blob += struct.pack("<I", len(val))
+                for k, v in val.items():
+                    self._pack(k)
+                    self._pack(v)
+            case list() | tuple() | set():
+                blob.append(kbin.T_SET if isinstance(val, set) else kbin.T_LIST)
+                blob += struct.pack("<I", len(val))
+                for v in val:
+                    self._pack(v)
+            case _:
+                raise TypeError(f"kbin 不支持的值类型 {type(val).__name__}")
+
+    def column(self, values: list) -> tuple[str, bytes, bytes | None]:
+        """ 打包一列, 返回 (列类型, 数组数据, 空值位图)
+        """
+        kinds = { type(v) for v in values if v is not None }
+        nulls = None
+        if None in values and kinds <= { int, float }:
+            nulls = bytearray((len(values) + 7) // 8)
+            for r, v in enumerate(values):
+                if v is None:
+                    nulls[r >> 3] |= 1 << (r & 7)
+
+        if kinds == { int } and all(v is None or -(1 << 63) <= v < (1 << 63) for v in values):
+            return "i8", struct.pack(f"<{len(values)}q", *(v or 0 for v in values)), nulls
+
+        if kinds == { float }:
+            return "f8", struct.pack(f"<{len(values)}d", *(v or 0.0 for v in values)), nulls
+
+        if kinds == { bool }:
+            return "b1", bytes(kbin.NULL_BOOL if v is None else int(v) for v in values), None
+
+        if kinds == { str }:
+            return "str", struct.pack(f"<{len(values)}I", *(kbin.NULL_STR if v is None else self.string(v) for v in values)), None
+
+        return "obj", struct.pack(f"<{len(values)}I", *(self.value(v) for v in values)), None
+
+    def strings(self) -> bytes:
+        encoded = [s.encode("utf-8") for s in self._strings]
+        offsets = [0]
+        for b in encoded:
+            offsets.append(offsets[-1] + len(b))
+
+        return struct.pack(f"<I{len(offsets)}I", len(encoded), *offsets) + b"".join(encoded)
+
+    def blob(self) -> bytes:
+        return bytes(self._blob)
+
+
+class KbinWriter(Writer):
+    """ kbin 二进制写入器, 运行时用 konfi.kbin.KbinSheet 读取
+        data/
+          |- config/
+          |- enum/
+    """
+    ext = "kbin" # 文件扩展名
+
+    def _plain(self, obj: Any) -> Any:
+        """ EType 转为基础类型, 枚举值转为整数
+        """
+        match obj:
+            case EEnumVal():
+                return obj.enum_val
+            case EnumPack():
+                return obj.val
+            case EDictM() | EDict():
+                return None if obj.py_val is None else { self._plain(k): self._plain(v) for k, v in obj.py_val.items() }
+            case EListM() | EList():
+                return None if obj.py_val is None else [self._plain(v) for v in obj.py_val]
+            case ESetM() | ESet():
+                return None if obj.py_val is None else { self._plain(v) for v in obj.py_val }
+            case EEnum():
+                return self._plain(obj.enum_dict_name)
+            case EType():
+                return obj.py_val
+            case dict():
+                return { self._plain(k): self._plain(v) for k, v in obj.items() }
+
+        return obj
+
+    def _column(self, packer: KbinPacker, table: SheetTable, var: str) -> tuple[str, bytes, bytes | None]:
+        """ 打包一列, array 列直接使用其内存, 原生类型列不再转换
+        """
+        conv = table.schema[var]
+        col = table.columns[var]
+        if isinstance(col, array) and col.typecode in ("q", "d"):
+            if sys.byteorder != "little":
+                col = array(col.typecode, col)
+                col.byteswap()
+            return ("i8" if col.typecode == "q" else "f8"), col.tobytes(), None
+
+        if conv is not None and conv.etype_cls in (EInt, EFloat, EBool, EString):
+            return packer.column(list(table.native(var)))
+
+        return packer.column([self._plain(table.etype(var, r)) for r in range(len(table))])
+
+    def _pack(self, table: SheetTable, is_table: bool) -> bytes:
+        packer = KbinPacker()
+        sections = bytearray() # 各段数据, 偏移相对数据区起点
+        
+        def place(data: bytes) -> int:
+            offset = len(sections)
+            sections.extend(data)
+            sections.extend(b"\0" * (-len(data) % 8))
+            return offset
+
+        header = {
+            "version": kbin.VERSION,
+            "sheet": table.name,
+            "title": table.info["title"],
+            "kind": "table" if is_table else "value",
+            "rows": 0,
+            "primary": table.primary if is_table else [],
+            "columns": [],
+            "indexes": {},
+        }
+
+        if is_table:
+            header["rows"] = len(table)
+
+            for var in table.columns:
+                col_type, data, nulls = self._column(packer, table, var)
+                header["columns"].append({
+                    "var": var,
+                    "type": col_type,
+                    "offset": place(data),
+                    "nulls": None if nulls is None else place(nulls),
+                })
+            
+            # 二级索引, 主键替换为行号
+            multi = len(table.primary) > 1
+            
+            def to_rows(node: dict | list, convs: list) -> dict | list:
+                if not convs:
+                    return [table.index[tuple(pk) if multi else pk] for pk in node]
+                return { self._plain(convs[0].box(k)): to_rows(v, convs[1:]) for k, v in node.items() }
+            
+            for name, node in table.indexes.items():
+                var_list = table.info["indexes"][name]
+                header["indexes"][name] = { "vars": var_list, "offset": packer.value(to_rows(node, [table.schema[var] for var in var_list])) }
+
+        else:
+            packer.value(self._plain(table.to_dict()))
+
+        header["strings"] = place(packer.strings())
+        header["blob"] = place(packer.blob())
+
+        head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        padding = b"\0" * (-(8 + len(head)) % 8)
+        return b"".join((kbin.MAGIC, struct.pack("<I", len(head)), head, padding, sections))
+
+    def _render(self, sheet_name: str, table: SheetTable, file_path: Path) -> tuple[list[tuple[Path, bytes]], dict[str, float]]:
+        is_table = table.info["sheet_type"] == SheetType.COMMON and bool(table.primary)
+        return [(file_path, self._pack(table, is_table))], {}
@@ -1,136 +1,285 @@
 
 from typing import Any
 from pathlib import Path
+import io
 import re
 
 from .writer import Writer
+from .string_table import StringTable
 from ..etypes import *
 from ..parsers import *
 
 
+_LUA_KEYWORDS = frozenset((
+    "and", "break", "do", "else", "elseif", "end", "false", "for", "function", "goto", "if", "in",
+    "local", "nil", "not", "or", "repeat", "return", "then", "true", "until", "while",
+))
+
+_LUA_ESCAPES = { "\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\0": "\\0" }
+
+
 class LuaWriter(Writer):
     """ lua 写入器
+        compact: 紧凑输出, 去掉缩进与换行
+        row_array: 多行数据表输出为行数组 sheet = { 行, ... } 与主键索引 sheet_keys = { [主键] = 行号 }
+                   行数组只分配数组部分, 客户端加载时分配更少
+        string_table: 字符串值输出为 S[序号], S 为 strings.lua 定义的全局表 strings, 引用了字符串的 sheet 需先加载
     """
     ext = "lua"
+    options = Writer.options + ("compact", "row_array", "flush_size")
+    compact = False # 紧凑输出
+    row_array = False # 数据表输出为行数组 + 主键索引
+    flush_size = 8192 # 缓冲片段数, 超过后写入缓冲区
+
+    def __init__(self, **options: Any):
+        super().__init__(**options)
 
-    def __init__(self):
-        super().__init__()
-        
         self._re = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
-    
-    def _to_lua(self, data: Any, indent: int = 0) -> str:
-        pad = "    " * indent
+        self._keys: dict[str, str] = {} # 字段名缓存 { 键: 编码后的键 }
+        self._uses_strings = False # 当前 sheet 是否引用了共享字符串表
 
-        match data:
-            case dict():
-                lines = []
-                for k, v in data.items():
-                    if isinstance(k, EType):
-                        k = self._to_lua(k)
-                    
-                    if not bool(self._re.match(k)): # 非法键名加 []
-                        k = f"[{k}]"
-                    
-                    v = self._to_lua(v, indent + 1)
-                    lines.append(f"{pad}    {k} = {v},")
-                    
-                return f"{{\n" + "\n".join(lines) + f"\n{pad}}}"
+    # ----------------------- 流式编码 ---------------------------------
 
-            case bool():
-                return "true" if data else "false"
+    def _string(self, s: str) -> str:
+        if '"' in s or "\\" in s or "\n" in s or "\r" in s or "\0" in s:
+            s = "".join(_LUA_ESCAPES.get(ch, ch) for ch in s)
 
-            case EnumPack():
-                return str(data.val)
+        return f'"{s}"'
+
+    def _string_ref(self, s: str) -> str:
+        """ 共享字符串表中的字符串, lua 下标从 1 开始
+        """
+        self._uses_strings = True
+        return f"S[{self._strings.ref(s) + 1}]"
+
+    def _number(self, val: int | float) -> str:
+        if isinstance(val, float):
+            if val != val:
+                return "0/0"
+            if val in (float("inf"), float("-inf")):
+                return "math.huge" if val > 0 else "-math.huge"
+
+        return repr(val)
+
+    def _key(self, key: Any) -> str:
+        """ 表键, 合法标识符直接作为字段名, 其余加 []
+        """
+        if isinstance(key, str):
+            res = self._keys.get(key, None)
+            if res is None:
+                is_name = bool(self._re.match(key)) and key not in _LUA_KEYWORDS
+                res = self._keys[key] = key if is_name else f"[{self._string(key)}]"
 
-            case EType():
-                if data.py_val is None:
-                    return "nil"
-                
-                match data:
-                    case EString():
-                        return f'"{data.py_val}"'
+            return res
 
-                    case EBool():
-                        return "true" if data.py_val else "false"
+        if isinstance(key, EString) and key.py_val is not None: # 键不使用共享字符串表
+            return f"[{self._string(key.py_val)}]"
 
-                    case EEnum():
-                        return self._to_lua(data.enum_dict_name, indent)
-                    
-                    case EEnumVal():
-                        return str(data.enum_val)
-                    
-                    case EListM() | EList():
-                        return f"{{ " + ", ".join(str(v) for v in data.py_val) + f" }}"
+        chunks = []
+        self._encode(key, chunks, 0)
+        return f"[{''.join(chunks)}]"
 
-                    case ESetM() | ESet():
-                        return self._to_lua({ v: True for v in data.py_val }, indent)
+    def _encode_items(self, items, chunks: list[str], depth: int, is_dict: bool):
+        """ 编码表, items 为 [(键, 值)] 或 [值]
+            字典每项单独一行, 列表写在一行
+        """
+        if self.compact:
+            chunks.append("{")
+            for i, item in enumerate(items):
+                if i:
+                    chunks.append(",")
+
+                if is_dict:
+                    chunks.append(self._key(item[0]))
+                    chunks.append("=")
+                    self._encode(item[1], chunks, depth + 1)
+                else:
+                    self._encode(item, chunks, depth + 1)
+
+            chunks.append("}")
+            return
+
+        if not is_dict:
+            chunks.append("{ ")
+            for i, item in enumerate(items):
+                if i:
+                    chunks.append(", ")
+                self._encode(item, chunks, depth + 1)
+
+            chunks.append(" }")
+            return
+
+        pad = "    " * depth
+        item_pad = pad + "    "
+        chunks.append("{\n")
+        for i, (k, v) in enumerate(items):
+            if i:
+                chunks.append("\n")
+
+            chunks.append(item_pad)
+            chunks.append(self._key(k))
+            chunks.append(" = ")
+            self._encode(v, chunks, depth + 1)
+            chunks.append(",")
+
+        chunks.append(f"\n{pad}}}")
+
+    def _encode(self, obj: Any, chunks: list[str], depth: int):
+        """ 遍历 EType 树, 编码结果追加到 chunks
+        """
+        match obj:
+            case None:
+                chunks.append("nil")
+            case bool():
+                chunks.append("true" if obj else "false")
+            case int() | float():
+                chunks.append(self._number(obj))
+            case str():
+                chunks.append(self._string(obj))
+            case EnumPack():
+                chunks.append(str(obj.val))
+            case dict():
+                self._encode_items(obj.items(), chunks, depth, True)
+            case list() | tuple():
+                self._encode_items(obj, chunks, depth, False)
+            case EType() if obj.py_val is None:
+                chunks.append("nil")
+            case EString() if self._strings is not None: # 共享字符串表
+                chunks.append(self._string_ref(obj.py_val))
+            case EString():
+                chunks.append(self._string(obj.py_val))
+            case EBool():
+                chunks.append("true" if obj.py_val else "false")
+            case EInt() | EFloat():
+                chunks.append(self._number(obj.py_val))
+            case EEnum():
+                self._encode(obj.enum_dict_name, chunks, depth)
+            case EEnumVal():
+                chunks.append(str(obj.enum_val))
+            case EListM() | EList():
+                self._encode_items(obj.py_val, chunks, depth, False)
+            case ESetM() | ESet():
+                self._encode_items(((v, True) for v in obj.py_val), chunks, depth, True)
+            case EDictM() | EDict():
+                self._encode_items(obj.py_val.items(), chunks, depth, True)
+            case _:
+                chunks.append(str(obj))
 
-                    case EDictM() | EDict():
-                        return self._to_lua(data.py_val, indent)
+    def _flush(self, chunks: list[str], f, force: bool=False):
+        if force or len(chunks) > self.flush_size:
+            f.write("".join(chunks))
+            chunks.clear()
 
-                    case _:
-                        return str(data)
-    
-    
-    def write(
-        self, 
-        data: dict[str, dict],
-        data_path: Path,
-    ) -> None:
-        config_path = data_path / "config"
-        enum_path = data_path / "enum"
-        
-        config_path.mkdir(parents=True, exist_ok=True)
-        enum_path.mkdir(parents=True, exist_ok=True)
-        
-        # 辅助
-        enum_sheets = []
-        modules: list[str] = []
-        
-        for sheet_name, sheet_data in data.items():
-            config = sheet_data.pop("_config", None)
-            primary = sheet_data.pop("_primary", None)
-            info = sheet_data.pop("_info", None)
-            table_sheet = f"{info['table_path'].name}/{info['title']}"
-            
-            sheet_type = info["sheet_type"]
-            is_enum_sheet = sheet_type == SheetType.ENUM
-            is_kv_sheet = sheet_type == SheetType.KV
-            path = is_enum_sheet and enum_path or config_path
-            
+    def _dump_rows(self, table: SheetTable, f):
+        """ 数据表按列编码, 不经过 to_dict 构建嵌套字典
+            int / float / bool / string 列直接编码原生值, 不再包装为 EType
+            单主键时输出 { [主键] = 行 }, row_array 时输出行数组
+        """
+        native = (EInt, EFloat, EBool, EString)
+        cols = [] # [(编码后的键, 列, 原生类型列, 需要包装时的转换器, 输出字符串表序号)]
+        for var, col in table.columns.items():
+            conv = table.schema[var]
+            is_native = conv is not None and conv.etype_cls in native
+            box_conv = None if table.boxed or conv is None or is_native else conv
+            str_ref = self._strings is not None and conv is not None and conv.etype_cls is EString
+            cols.append((self._key(var), col, is_native and table.boxed, box_conv, str_ref))
 
-            # 模块
-            module = info.get("module", None)
-            if module:
-                path = path / module
-                path.mkdir(parents=True, exist_ok=True)
-                
-                modules.append(module)
-            
-            
-            file_path = path / f"{sheet_name}.{self.ext}"
-            with file_path.open("w", encoding="utf-8") as f:
-                f.write(f"-- {sheet_name}\n\n")
-                res = self._to_lua(sheet_data)
-                f.write(f"{sheet_name} = {res}")
-                
-                
-                
-        
-        
+        key_conv = table.schema[table.primary[0]] if len(table.primary) == 1 else None
+        compact = self.compact
+        if compact:
+            row_left, row_sep, key_sep, row_end = "{", ",", "=", "}"
+        else:
+            row_left, row_sep, key_sep, row_end = "{\n        ", ",\n        ", " = ", ",\n    }"
 
+        chunks = ["{" if compact else "{\n"]
+        for r in range(len(table)):
+            if r:
+                chunks.append("," if compact else ",\n")
+            if not compact:
+                chunks.append("    ")
 
+            if not self.row_array:
+                k = table.keys[r]
+                chunks.append(self._key(k if table.boxed or key_conv is None else key_conv.box(k)))
+                chunks.append(key_sep)
 
+            if not cols:
+                chunks.append("{}" if compact else "{\n\n    }")
+                continue
 
+            chunks.append(row_left)
+            for i, (name, col, unbox, conv, str_ref) in enumerate(cols):
+                if i:
+                    chunks.append(row_sep)
 
+                chunks.append(name)
+                chunks.append(key_sep)
+                val = col[r]
+                if unbox and val is not None: # 原生类型的 EType 直接取值
+                    val = val.py_val
+                elif conv is not None:
+                    val = conv.box(val)
+                if str_ref and val is not None:
+                    chunks.append(self._string_ref(val))
+                    continue
+                self._encode(val, chunks, 2)
 
+            chunks.append(row_end)
+            self._flush(chunks, f)
 
+        chunks.append("}" if compact else ",\n}" if len(table) else "\n}")
+        self._flush(chunks, f, True)
 
+    def _key_index(self, table: SheetTable) -> dict:
+        """ 主键索引 { 主键1: ... { 主键n: 行号 } }, 行号从 1 开始
+        """
+        convs = [table.schema[key] for key in table.primary]
+        res = {}
+        last = len(convs) - 1
+        for r, pk in enumerate(table.keys, 1):
+            pk = pk if len(convs) > 1 else (pk,)
+            data = res
+            for idx, (conv, k) in enumerate(zip(convs, pk)):
+                k = k if table.boxed or conv is None else conv.box(k)
+                if idx == last:
+                    data[k] = r
+                else:
+                    data = data.setdefault(k, {})
 
+        return res
 
+    # -----------------------------------------------------------------
 
+    def _render_strings(self, strings: StringTable, data_path: Path) -> list[tuple[Path, bytes]]:
+        chunks = []
+        self._encode_items(strings.strings, chunks, 0, False)
+        sep = "\n" if self.compact else "\n\n"
+        return [(data_path / f"strings.{self.ext}", self._encode_text(f"-- strings{sep}strings = {''.join(chunks)}"))]
 
+    def _render(self, sheet_name: str, table: SheetTable, file_path: Path) -> tuple[list[tuple[Path, bytes]], dict[str, float]]:
+        f = io.StringIO()
+        sep = "\n" if self.compact else "\n\n"
+        self._uses_strings = False
+        f.write(f"{sheet_name} = ")
 
+        is_rows = table.kind == "rows" and bool(table.primary)
+        if is_rows and (self.row_array or len(table.primary) == 1):
+            self._dump_rows(table, f)
+        else:
+            chunks = []
+            self._encode(table.to_dict(), chunks, 0)
+            f.write("".join(chunks))
 
+        if is_rows and self.row_array: # 主键索引
+            chunks = []
+            self._encode(self._key_index(table), chunks, 0)
+            f.write(f"{sep}{sheet_name}_keys = {''.join(chunks)}")
 
+        if indexes := table.etype_indexes(): # 二级索引
+            chunks = []
+            self._encode(indexes, chunks, 0)
+            f.write(f"{sep}{sheet_name}_index = {''.join(chunks)}")
 
+        # 只有引用了共享字符串表的 sheet 才依赖先加载 strings.lua
+        head = f"-- {sheet_name}{sep}" + ("local S = strings\n" if self._uses_strings else "")
+        return [(file_path, self._encode_text(head + f.getvalue()))], {}
@@ -1,10 +1,53 @@
 
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Callable
+import io
+import re
+import time
+import unicodedata
 
 from .writer import Writer
 from ..etypes import *
-from ..parsers import SheetType, SheetConfig
+from ..parsers import SheetType, SheetConfig, SheetTable
+
+
+def _str_width(s: str) -> int:
+    """ 字符串显示宽度, 东亚宽字符计 2, 与 black 计算行宽的方式一致
+    """
+    if s.isascii():
+        return len(s)
+
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in s)
+
+# 模块顶层定义的名字: 枚举类与 sheet 数据 / 二级索引
+_top_level_re = re.compile(r"^(?:class (\w+)\(|(\w+) = )", re.M)
+
+# 延迟导入的包, 首次访问名字时才导入所在模块
+_LAZY_INIT = '''# export by konfi
+
+import importlib
+
+# 名字: 所在模块
+_index = {{
+{index}}}
+
+__all__ = list(_index)
+
+
+def __getattr__(name):
+    module = _index.get(name)
+    if module is None:
+        raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+
+    value = getattr(importlib.import_module(f".{{module}}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _index.keys())
+'''
 
 
 class PyWriter(Writer):
@@ -14,119 +57,206 @@ class PyWriter(Writer):
           |- enum/
     """
     ext = "py" # 文件扩展名
+    options = Writer.options + ("line_length", "use_black", "lazy_import")
+    line_length = 30 # 数据行宽
+    use_black = False # 是否再用 black 格式化数据, 需要安装 black
+    lazy_import = False # 是否生成延迟导入的包, __init__ 不再导入所有模块, 访问 sheet 时才导入
     
-    def write(
-        self, 
-        data: dict[str, dict],
-        data_path: Path,
-    ) -> None:
+    # ----------------------- 格式化数据 ---------------------------------
+
+    def _atom(self, obj: Any) -> str:
+        """ 非容器值的字面量, 字符串优先使用双引号, 指数去掉 +, 与 black 规范化结果一致
+        """
+        match obj:
+            case EDict() | EDictM() | EList() | EListM() | ESet() | ESetM():
+                return self._atom(obj.py_val)
+            
+            case EString() | EEnumVal():
+                return repr(obj)
+            
+            case EType():
+                return self._atom(obj.py_val)
+            
+            case str():
+                s = repr(obj)
+                if s[0] == "'" and '"' not in obj:
+                    s = f'"{s[1:-1]}"'.replace("\\'", "'")
+                return s
+            
+            case float():
+                return repr(obj).replace("e+", "e")
+            
+        return repr(obj)
+
+    def _items(self, obj: Any) -> tuple[str, str, list[tuple[str, Any]]] | None:
+        """ 容器的括号与元素 [(前缀, 值)], 非容器或空容器返回 None
+        """
+        match obj:
+            case EDict() | EDictM() | EList() | EListM() | ESet() | ESetM():
+                return self._items(obj.py_val)
+            
+            case dict() if obj:
+                return "{", "}", [(f"{self._atom(k)}: ", v) for k, v in obj.items()]
+            
+            case list() if obj:
+                return "[", "]", [("", v) for v in obj]
+            
+            case set() if obj:
+                return "{", "}", [("", v) for v in obj]
+            
+        return None
+
+    def _write_init(self, package_path: Path, pattern: str):
+        """ 写入包的 __init__, 导入包内匹配 pattern 的所有模块
+            lazy_import 时生成名字到模块的索引, 由模块级 __getattr__ 按需导入
+        """
+        init_path = package_path / "__init__.py"
+        paths = sorted(path for path in package_path.glob(pattern) if path.name != "__init__.py") # 排序, 避免内容随文件系统顺序变化
         
-        import black
-        mode = black.Mode(line_length=30)
+        if self.lazy_import:
+            index = {}
+            for path in paths:
+                for m in _top_level_re.finditer(path.read_text(encoding="utf-8")):
+                    index.setdefault(m.group(1) or m.group(2), path.stem)
+            
+            text = _LAZY_INIT.format(index="".join(f'    "{name}": "{module}",\n' for name, module in index.items()))
+        else:
+            text = "".join(f"from .{path.stem} import *\n" for path in paths)
         
-        config_path = data_path / "config"
-        enum_path = data_path / "enum"
+        self._commit(init_path, self._encode_text(text))
+
+    def _flat(self, obj: Any, budget: int, items: tuple | None=None) -> str | None:
+        """ 单行字面量, 宽度超过 budget 时提前返回 None
+        """
+        items = items or self._items(obj)
+        if items is None:
+            s = self._atom(obj)
+            return s if _str_width(s) <= budget else None
         
-        config_path.mkdir(parents=True, exist_ok=True)
-        enum_path.mkdir(parents=True, exist_ok=True)
+        left, right, elems = items
+        width = len(left) + len(right)
+        parts = [left]
+        for i, (prefix, val) in enumerate(elems):
+            if i:
+                parts.append(", ")
+                width += 2
+            
+            width += _str_width(prefix)
+            s = self._flat(val, budget - width)
+            if s is None:
+                return None
+            
+            parts += (prefix, s)
+            width += _str_width(s)
         
-        # 辅助
-        enum_sheets = []
-        modules: list[str] = []
+        if width > budget:
+            return None
         
-        for sheet_name, sheet_data in data.items():
-            config = sheet_data.pop("_config", None)
-            primary = sheet_data.pop("_primary", None)
-            info = sheet_data.pop("_info")
-            table_sheet = f"{info['table_path'].name}/{info['title']}"
-            
-            sheet_type = info["sheet_type"]
-            is_enum_sheet = sheet_type == SheetType.ENUM
-            is_kv_sheet = sheet_type == SheetType.KV
-            path = is_enum_sheet and enum_path or config_path
-
-            # 模块
-            module = info.get("module", None)
-            if module:
-                path = path / module
-                path.mkdir(parents=True, exist_ok=True)
-                
-                modules.append(module)
-
-            file_path = path / f"{sheet_name}.{self.ext}"
-            with file_path.open("w", encoding="utf-8") as f:
-                # 写入注释
-                f.write(f"# {table_sheet}\n")
-                # f.write(f"# {datetime.now().isoformat(sep=' ', timespec='seconds')}\n")
-                f.write(f"# export by konfi\n\n")
-                
-                # 写入配置
-                if config:
-                    max_len = max(len(c[SheetConfig.VAR]) for c in config.values())
-                    for col in config.values():
-                        var = col[SheetConfig.VAR]
-                        etype = col[SheetConfig.TYPE]
-                        label = col.get(SheetConfig.LABEL, '')
-                        f.write(f"# {var:{max_len}}: {etype} {label}\n")
-
-                    f.write("\n")
-                
-                # 写入数据
-                if is_enum_sheet: # 1. 枚举表
-                    f.write("from enum import Enum\n\n")
-                    for eenum in sheet_data.values():
-                        f.write(f"{repr(eenum)}\n\n")
+        parts.append(right)
+        return "".join(parts)
 
-                    enum_sheets.append(sheet_name)
-                
-                elif is_kv_sheet: # 2. 键值表
-                    if enums := info.get("enums", None): # 导入所需枚举
-                        f.write(f"from {module and '...' or '..'}enum import {', '.join(enums)}\n")
-                    
-                    if refs := info.get("refs", None):
-                        f.write(f"from {module and '...' or '..'}type import {', '.join(refs)}\n")
-                    
-                    f.write("\n\n")
-                    if sheet_data:
-                        max_len = max(len(repr(k)) for k in sheet_data)
-                        f.write(f"{sheet_name} = {{\n")
-                        for k, v in sheet_data.items():
-                            f.write(f'    {repr(k):{max_len}}: {repr(v)},\n')
-                        f.write("}\n")
-                    
-                    else:
-                        f.write(f"{sheet_name} = {{}}")
-
-                else: # 3. 其他表
-                    if enums := info.get("enums", None): # 导入所需枚举
-                        f.write(f"from {module and '...' or '..'}enum import {', '.join(enums)}\n")
-                    
-                    if refs := info.get("refs", None):
-                        f.write(f"from {module and '...' or '..'}type import {', '.join(refs)}\n")
-                        
-                    f.write("\n\n")
-                    formatted = repr(sheet_data)
-                    formatted = black.format_str(f"{sheet_name} = {formatted}", mode=mode)
-                    f.write(formatted)
-
-                print(f"[konfi] 导出 {table_sheet}")
+    def _format(self, write: Callable[[str], Any], prefix: str, obj: Any, suffix: str, depth: int):
+        """ 逐行写出 prefix + 值 + suffix, 超出行宽的容器每个元素单独一行并补尾逗号
+            单元素容器不补逗号, 与 black 的拆分规则一致
+        """
+        head = f"{'    ' * depth}{prefix}"
+        items = self._items(obj)
+        flat = self._flat(obj, self.line_length - _str_width(head) - _str_width(suffix), items)
+        if flat is not None or items is None:
+            write(f"{head}{flat if flat is not None else self._atom(obj)}{suffix}\n")
+            return
+        
+        left, right, elems = items
+        sep = "," if len(elems) > 1 else ""
+        write(f"{head}{left}\n")
+        for elem_prefix, val in elems:
+            self._format(write, elem_prefix, val, sep, depth + 1)
+        write(f"{'    ' * depth}{right}{suffix}\n")
+
+    # -----------------------------------------------------------------
+
+    def _render(self, sheet_name: str, table: SheetTable, file_path: Path) -> tuple[list[tuple[Path, bytes]], dict[str, float]]:
+        config, info = table.config, table.info
+        table_sheet = f"{info['table_path'].name}/{info['title']}"
+        module = info.get("module", None)
+        
+        sheet_type = info["sheet_type"]
+        is_enum_sheet = sheet_type == SheetType.ENUM
+        is_kv_sheet = sheet_type == SheetType.KV
+        
+        black_time = 0.0
+        sheet_data = table.to_dict()
+        indexes = table.etype_indexes()
+        
+        f = io.StringIO()
+        # 写入注释
+        f.write(f"# {table_sheet}\n")
+        # f.write(f"# {datetime.now().isoformat(sep=' ', timespec='seconds')}\n")
+        f.write(f"# export by konfi\n\n")
+        
+        # 写入配置
+        if config:
+            max_len = max(len(c[SheetConfig.VAR]) for c in config.values())
+            for col in config.values():
+                var = col[SheetConfig.VAR]
+                etype = col[SheetConfig.TYPE]
+                label = col.get(SheetConfig.LABEL, '')
+                f.write(f"# {var:{max_len}}: {etype} {label}\n")
 
+            f.write("\n")
+        
+        # 写入数据
+        if is_enum_sheet: # 1. 枚举表
+            f.write("from enum import Enum\n\n")
+            for eenum in sheet_data.values():
+                f.write(f"{repr(eenum)}\n\n")
+        
+        elif is_kv_sheet: # 2. 键值表
+            if enums := info.get("enums", None): # 导入所需枚举
+                f.write(f"from {module and '...' or '..'}enum import {', '.join(sorted(enums))}\n")
+            
+            if refs := info.get("refs", None):
+                f.write(f"from {module and '...' or '..'}type import {', '.join(sorted(refs))}\n")
+            
+            f.write("\n\n")
+            if sheet_data:
+                max_len = max(len(repr(k)) for k in sheet_data)
+                f.write(f"{sheet_name} = {{\n")
+                for k, v in sheet_data.items():
+                    f.write(f'    {repr(k):{max_len}}: {repr(v)},\n')
+                f.write("}\n")
+            
+            else:
+                f.write(f"{sheet_name} = {{}}")
 
+        else: # 3. 其他表
+            if enums := info.get("enums", None): # 导入所需枚举
+                f.write(f"from {module and '...' or '..'}enum import {', '.join(sorted(enums))}\n")
+            
+            if refs := info.get("refs", None):
+                f.write(f"from {module and '...' or '..'}type import {', '.join(sorted(refs))}\n")
+                
+            f.write("\n\n")
+            lines = []
+            write = lines.append if self.use_black else f.write
+            self._format(write, f"{sheet_name} = ", sheet_data, "", 0)
+            if indexes: # 二级索引
+                write("\n")
+                self._format(write, f"{sheet_name}_index = ", indexes, "", 0)
+            
+            if self.use_black:
+                import black
+                black_start = time.perf_counter()
+                f.write(black.format_str("".join(lines), mode=black.Mode(line_length=self.line_length)))
+                black_time = time.perf_counter() - black_start
         
-        # 后处理
+        extra = { "black": black_time } if self.use_black else {}
+        return [(file_path, self._encode_text(f.getvalue()))], extra
+
+    def _finish(self, data_path: Path, modules: list[str]):
         # 写入 enum init
-        enum_init_path = enum_path / "__init__.py"        
-        with enum_init_path.open("w", encoding="utf-8") as f:
-            for path in enum_path.glob("*_enum.py"):
-                f.write(f"from .{path.stem} import *\n")
+        self._write_init(data_path / "enum", "*_enum.py")
 
         # 写入 module init
         for module in modules:
-            module_path = config_path / module
-            module_init_path = module_path / "__init__.py"
-            with module_init_path.open("w", encoding="utf-8") as f:
-                for path in module_path.glob("[!_]*.py"):
-                    f.write(f"from .{path.stem} import *\n")
-            
-            
-            
\ No newline at end of file
+            self._write_init(data_path / "config" / module, "[!_]*.py")
@@ -0,0 +1,111 @@
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import json
+
+from ..etypes import *
+from ..parsers import SheetTable
+
+
+class StringTable:
+    """ 导出目录共享的字符串表, 字符串值 (EString) 改为输出在表中的序号
+        只追加不删除, 保存在 .konfi/strings.json, 增量导表与监视模式下未重新写入的文件引用的序号保持有效
+    """
+
+    def __init__(self, strings: list[str]=None):
+        self.strings: list[str] = list(strings or [])
+        self._index: dict[str, int] = { s: i for i, s in enumerate(self.strings) }
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def index(self, s: str) -> int:
+        """ 字符串的序号, 从 0 开始, 不存在时追加
+        """
+        idx = self._index.get(s, None)
+        if idx is None:
+            idx = self._index[s] = len(self.strings)
+            self.strings.append(s)
+
+        return idx
+
+    def ref(self, s: str) -> int:
+        """ 已收集字符串的序号, 序列化时使用, 子进程中追加的字符串无法同步, 不存在时报错
+        """
+        return self._index[s]
+
+    # ----------------------- 收集字符串 ---------------------------------
+
+    def _collect(self, obj: Any):
+        """ 收集值中的 EString, 字典的键与集合 (输出为键) 不收集
+        """
+        match obj:
+            case EString():
+                if obj.py_val is not None:
+                    self.index(obj.py_val)
+            case EListM() | EList():
+                for v in obj.py_val or ():
+                    self._collect(v)
+            case EDictM() | EDict():
+                for v in (obj.py_val or {}).values():
+                    self._collect(v)
+            case dict():
+                for v in obj.values():
+                    self._collect(v)
+            case list() | tuple():
+                for v in obj:
+                    self._collect(v)
+
+    def collect(self, table: SheetTable):
+        """ 按行顺序收集 sheet 中的字符串值与二级索引中的字符串主键
+        """
+        if table.kind != "rows":
+            self._collect(table.to_dict())
+        else:
+            native = (EInt, EFloat, EBool)
+            cols = []
+            for var, col in table.columns.items():
+                conv = table.schema[var]
+                if table.boxed or conv is None:
+                    cols.append((col, None, False))
+                elif conv.etype_cls is EString:
+                    cols.append((col, None, True))
+                elif conv.etype_cls not in native:
+                    cols.append((col, conv, False))
+
+            for r in range(len(table)):
+                for col, conv, is_str in cols:
+                    val = col[r]
+                    if is_str:
+                        if val is not None:
+                            self.index(val)
+                    else:
+                        self._collect(val if conv is None else conv.box(val))
+
+        if table.indexes:
+            self._collect(table.etype_indexes())
+
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path) -> StringTable | None:
+        """ 读取上次导出的字符串表, 不存在或无法读取时返回 None
+            此时已导出文件中的序号无法对应, 需重新写入所有 sheet
+        """
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                strings = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+            return None
+
+        return cls(strings)
+
+    def dumps(self) -> bytes:
+        """ 保存的内容, 由写入器替换文件
+        """
+        return json.dumps(self.strings, ensure_ascii=False).encode("utf-8")
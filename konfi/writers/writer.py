@@ -1,6 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from ..parsers import SheetType, SheetTable
+from ..hooks import WriteStats
+from .string_table import StringTable
 
 class WriterMeta(type):
     """ 写入器元类
@@ -23,37 +34,266 @@ class WriterMeta(type):
 
 class Writer(metaclass=WriterMeta):
     """ 写入器
+        选项在创建写入器时设置, 保存在实例上, 类属性为默认值
+        同一格式的多个写入器可使用不同选项, 发送到子进程时选项随实例一起序列化
     """
     ext = "" # 文件扩展名
+    options: tuple[str, ...] = ("workers", "string_table") # 写入器选项名, 派生写入器追加自己的选项
+    workers = 1 # 并行序列化 sheet 的进程数
+    string_table = False # 字符串值输出为导出目录共享字符串表中的序号, 需写入器支持
     
     _reg_writers_cls: dict[str, type[Writer]] = {}
-    _writers: dict[str, type[Writer]] = {} # 单例
+    _writers: dict[str, Writer] = {} # 默认选项的单例
+    
+    on_write: Callable[[WriteStats], None] = None # 单个文件写入完成的回调, 由导出器设置
+    _strings: StringTable = None # 序列化 sheet 时使用的共享字符串表
     
 
-    @classmethod
-    def get_writer(cls, ext: str) -> type[Writer]:
-        if ext in cls._writers:
-            return cls._writers[ext]
+    def __init__(self, **options: Any):
+        unknown = options.keys() - set(self.options)
+        if unknown:
+            raise ValueError(f"Writer {self.ext} 不支持选项 {', '.join(sorted(unknown))}")
         
+        for name in self.options:
+            setattr(self, name, options.get(name, getattr(type(self), name)))
+
+    @classmethod
+    def create(cls, ext: str, **options: Any) -> Writer:
+        """ 创建写入器, options 覆盖选项的默认值
+        """
         writer_cls = cls._reg_writers_cls.get(ext, None)
-        if writer_cls:
-            writer = writer_cls()
-            cls._writers[ext] = writer
-            return writer
-            
-        else:
+        if writer_cls is None:
             raise ValueError(f"Writer {ext} 未找到")
+        
+        return writer_cls(**options)
+
+    @classmethod
+    def get_writer(cls, ext: str) -> Writer:
+        if ext not in cls._writers:
+            cls._writers[ext] = cls.create(ext)
+        
+        return cls._writers[ext]
+    
+    def get_options(self) -> dict[str, Any]:
+        """ 当前生效的选项
+        """
+        return { name: getattr(self, name) for name in self.options }
+    
+    def _options_fingerprint(self) -> bytes:
+        """ 影响输出内容的选项, 保存在导出目录, 增量导表时与上次导出比较
+        """
+        options = self.get_options()
+        options.pop("workers", None)
+        return json.dumps(options, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8")
+    
+    def __getstate__(self) -> dict:
+        """ 发送到子进程时去掉导出器设置的回调
+        """
+        state = self.__dict__.copy()
+        state.pop("on_write", None)
+        return state
  
+    def _written(self, sheet_name: str, file_path: Path, start: float, **extra: float):
+        """ 文件写入完成, 报告耗时与文件大小, start 为开始写入的 time.perf_counter()
+        """
+        if self.on_write is not None:
+            self.on_write(WriteStats(sheet_name, file_path, time.perf_counter() - start, file_path.stat().st_size, extra))
+
+
+    @staticmethod
+    def _encode_text(text: str) -> bytes:
+        """ 文本编码为 utf-8, 换行与文本模式写入文件一致
+        """
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        
+        return text.encode("utf-8")
+    
+    def _commit(self, file_path: Path, data: bytes) -> bool:
+        """ 先写入临时文件再替换, 中断时不会留下写了一半的文件
+            内容未变化时不写入, 保留原文件的修改时间, 返回是否写入
+        """
+        try:
+            if file_path.stat().st_size == len(data) and file_path.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+        
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp_path.open("wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        return True
+
+    def _render(self, sheet_name: str, table: SheetTable, file_path: Path) -> tuple[list[tuple[Path, bytes]], dict[str, float]]:
+        """ 序列化一个 sheet 到内存, 返回 ([(文件路径, 内容)], 附加耗时)
+            file_path 为 sheet 的主文件路径, 可在同目录输出其他文件, 如二级索引
+        """
+        raise NotImplementedError("子类必须实现 _render 方法")
+
+    def _render_strings(self, strings: StringTable, data_path: Path) -> list[tuple[Path, bytes]]:
+        """ 序列化共享字符串表, 返回 [(文件路径, 内容)]
+        """
+        raise NotImplementedError(f"写入器 {self.ext} 不支持共享字符串表")
+
+    def _finish(self, data_path: Path, modules: list[str]):
+        """ 所有 sheet 写入后的后处理, modules 为本次写入的模块
+        """
+        pass
+
+    def _plan(self, tables: dict[str, SheetTable], data_path: Path, full: bool=False) -> tuple[list[tuple[str, SheetTable, Path]], list[str]]:
+        """ 创建导出目录, 返回需要序列化的 [(sheet 名, 数据, 主文件路径)] 与涉及的模块
+            full 时忽略增量导表的缓存标记, 所有 sheet 重新序列化
+        """
+        config_path = data_path / "config"
+        enum_path = data_path / "enum"
+        
+        config_path.mkdir(parents=True, exist_ok=True)
+        enum_path.mkdir(parents=True, exist_ok=True)
+        
+        tasks: list[tuple[str, SheetTable, Path]] = []
+        modules: list[str] = []
+        for sheet_name, table in tables.items():
+            info = table.info
+            path = enum_path if info["sheet_type"] == SheetType.ENUM else config_path
+            
+            # 模块
+            module = info.get("module", None)
+            if module:
+                path = path / module
+                path.mkdir(parents=True, exist_ok=True)
+                
+                modules.append(module)
+            
+            file_path = path / f"{sheet_name}.{self.ext}"
+            if not full and info.get("cached") and file_path.exists(): # 增量导表, 未变化且已导出
+                continue
+            
+            tasks.append((sheet_name, table, file_path))
+        
+        return tasks, modules
+
+    def _commit_all(self, tasks: list[tuple[str, SheetTable, Path]], results: list[tuple], data_path: Path, modules: list[str]):
+        """ 按序列化结果替换文件, 再执行后处理
+        """
+        unchanged = 0
+        for (sheet_name, table, _), (files, seconds, extra) in zip(tasks, results):
+            for i, (file_path, data) in enumerate(files):
+                start = time.perf_counter() - (seconds if i == 0 else 0.0) # 序列化耗时计入主文件
+                if not self._commit(file_path, data):
+                    unchanged += 1
+                
+                self._written(sheet_name, file_path, start, **(extra if i == 0 else {}))
+            
+            print(f"[konfi] 导出 {table.info['table_path'].name}/{table.info['title']} ({self.ext})")
+        
+        if unchanged:
+            print(f"[konfi] {self.ext}: {unchanged} 个文件内容未变化, 跳过写入")
+        
+        self._finish(data_path, modules)
 
     def write(
         self, 
-        data: dict, 
+        tables: dict[str, SheetTable], 
         data_path: Path,
     ) -> None:
-        """ 写入数据
+        """ 写入数据, tables 为各 sheet 的列式中间表示, 写入器不应修改
         """
-        raise NotImplementedError("子类必须实现 write 方法")
+        write_targets([(self, data_path)], tables, self.workers)
+
+
+def write_targets(targets: list[tuple[Writer, Path]], tables: dict[str, SheetTable], workers: int=1):
+    """ 多个写入器写入同一份数据, targets 为 [(写入器, 导出目录)]
+        先将所有写入器的 sheet 序列化到内存, workers 大于 1 时在同一个进程池中并行, 全部成功后再逐个替换文件
+    """
+    plans = []
+    for writer, data_path in targets:
+        # 写入器选项与上次导出不同 (或没有记录) 时, 增量导表缓存的 sheet 也需按新选项重新写入
+        options_path = data_path / ".konfi" / f"{writer.ext}_options.json"
+        options = writer._options_fingerprint()
+        full = not options_path.is_file() or options_path.read_bytes() != options
+        
+        strings = None
+        if writer.string_table:
+            strings = StringTable.load(data_path / ".konfi" / "strings.json")
+            if strings is None: # 字符串表丢失或损坏, 缓存 sheet 中的序号无法对应, 全部重新写入
+                strings = StringTable()
+                full = True
+        
+        tasks, modules = writer._plan(tables, data_path, full)
+        if strings is not None: # 在主进程中收集待写入 sheet 的字符串, 序号在子进程中保持一致
+            for _, table, _ in tasks:
+                strings.collect(table)
+        
+        plans.append((tasks, modules, strings, options_path, options))
+    
+    jobs = [(writer, strings, task) for (writer, _), (tasks, _, strings, _, _) in zip(targets, plans) for task in tasks]
+    results = _render_all(jobs, workers)
+    
+    start = 0
+    for (writer, data_path), (tasks, modules, strings, options_path, options) in zip(targets, plans):
+        if strings is not None: # 字符串表只追加, 先于引用它的文件写入
+            for file_path, data in writer._render_strings(strings, data_path):
+                writer._commit(file_path, data)
+            
+            (data_path / ".konfi").mkdir(parents=True, exist_ok=True)
+            writer._commit(data_path / ".konfi" / "strings.json", strings.dumps())
+        
+        writer._commit_all(tasks, results[start:start + len(tasks)], data_path, modules)
+        start += len(tasks)
+        
+        options_path.parent.mkdir(parents=True, exist_ok=True)
+        writer._commit(options_path, options)
+
 
+def _render_task(job: tuple[Writer, StringTable, tuple[str, SheetTable, Path]]) -> tuple[list[tuple[Path, bytes]], float, dict[str, float]]:
+    """ 序列化一个 sheet, 返回 ([(文件路径, 内容)], 耗时, 附加耗时), 可在子进程中执行
+    """
+    writer, strings, task = job
+    start = time.perf_counter()
+    writer._strings = strings
+    try:
+        files, extra = writer._render(*task)
+    finally:
+        writer._strings = None
+    
+    return files, time.perf_counter() - start, extra
 
+_fork_jobs: list[tuple[Writer, StringTable, tuple[str, SheetTable, Path]]] = None # fork 的子进程继承的任务
 
+def _render_fork_task(i: int) -> tuple[list[tuple[Path, bytes]], float, dict[str, float]]:
+    return _render_task(_fork_jobs[i])
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """ 序列化 sheet 的子进程启动方式
+        linux 上使用 fork, 其他平台使用默认方式 (macOS 与 windows 为 spawn), macOS 上 fork 不安全
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    
+    return multiprocessing.get_context()
 
+def _render_all(jobs: list[tuple[Writer, StringTable, tuple[str, SheetTable, Path]]], workers: int) -> list[tuple[list[tuple[Path, bytes]], float, dict[str, float]]]:
+    """ 序列化所有 sheet, 结果与 jobs 顺序一致
+        fork 启动的子进程直接继承 sheet 数据, 只发送序号, 避免序列化数据的开销超过并行的收益
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [_render_task(job) for job in jobs]
+    
+    ctx = _mp_context()
+    if ctx.get_start_method() == "fork":
+        global _fork_jobs
+        _fork_jobs = jobs
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                return list(pool.map(_render_fork_task, range(len(jobs))))
+        finally:
+            _fork_jobs = None
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(_render_task, jobs))
@@ -0,0 +1,27 @@
+""" 测试公用夹具
+"""
+
+from pathlib import Path
+from typing import Callable
+
+import openpyxl as xl
+import pytest
+
+
+@pytest.fixture
+def write_table() -> Callable[[Path, dict[str, list[tuple]]], Path]:
+    """ 按 { sheet 标题: 行列表 } 写入 xlsx 表格, 返回表格路径
+    """
+    def write(path: Path, sheets: dict[str, list[tuple]]) -> Path:
+        wb = xl.Workbook()
+        wb.remove(wb.active)
+        for title, rows in sheets.items():
+            ws = wb.create_sheet(title)
+            for row in rows:
+                ws.append(list(row))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        wb.save(path)
+        return path
+
+    return write
@@ -0,0 +1,110 @@
+""" 导出器回归测试
+"""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from konfi import Exportor
+from konfi.hooks import ExportHook, SheetStats
+
+
+DESIGN_DIR = Path(__file__).resolve().parent.parent / "design"
+
+
+def _read(data_dir: Path, ext: str) -> dict[str, bytes]:
+    return {
+        p.relative_to(data_dir).as_posix(): p.read_bytes()
+        for p in data_dir.rglob(f"*.{ext}") if ".konfi" not in p.parts
+    }
+
+def _export(table_dir: Path, data_dir: Path, ext: str="lua", **kwargs) -> Exportor:
+    exportor = Exportor(table_dir=str(table_dir), data_dir=str(data_dir), writer_ext=ext, enum_tables={"枚举"}, **kwargs)
+    exportor.run()
+    return exportor
+
+
+@pytest.fixture
+def table_dir(tmp_path: Path) -> Path:
+    return Path(shutil.copytree(DESIGN_DIR, tmp_path / "design"))
+
+
+def test_incremental_writer_options_changed(table_dir: Path, tmp_path: Path):
+    """ 增量导表时写入器选项变化, 缓存的 sheet 也按新选项重新写入
+    """
+    data_dir = tmp_path / "data"
+    _export(table_dir, data_dir, is_inc=True)
+    _export(table_dir, data_dir, is_inc=True, writer_options={ "compact": True })
+
+    fresh = tmp_path / "fresh"
+    _export(table_dir, fresh, writer_options={ "compact": True })
+
+    assert _read(data_dir, "lua") == _read(fresh, "lua")
+
+
+@pytest.mark.parametrize("damage", ["missing", "corrupt"])
+def test_incremental_string_table_lost(damage: str, table_dir: Path, tmp_path: Path):
+    """ 增量导表时共享字符串表丢失或损坏, 重新写入所有 sheet, 与完整导出一致
+    """
+    data_dir = tmp_path / "data"
+    _export(table_dir, data_dir, "json", is_inc=True, writer_options={ "string_table": True })
+
+    strings_path = data_dir / ".konfi" / "strings.json"
+    if damage == "missing":
+        strings_path.unlink()
+    else:
+        strings_path.write_text("[1, ", encoding="utf-8")
+
+    _export(table_dir, data_dir, "json", is_inc=True, writer_options={ "string_table": True })
+
+    fresh = tmp_path / "fresh"
+    _export(table_dir, fresh, "json", writer_options={ "string_table": True })
+
+    assert _read(data_dir, "json") == _read(fresh, "json")
+    assert strings_path.read_bytes() == (fresh / ".konfi" / "strings.json").read_bytes()
+
+
+class _ParseRecorder(ExportHook):
+    """ 记录解析过的 sheet 标题
+    """
+    def __init__(self):
+        self.titles = []
+
+    def on_parse(self, stats: SheetStats):
+        self.titles.append(stats.title)
+
+
+def test_incremental_enum_renamed(write_table, tmp_path: Path):
+    """ 增量导表时枚举改名, 只重新解析用到该枚举的 sheet, 结果与完整导出一致
+    """
+    table_dir = tmp_path / "design"
+    enums = [
+        ("!var", "enum_cls", "enum_cls_alias", "enum_name", "enum_alias", "enum_val"),
+        (None, "KindEnum", "类别", "WEAPON", "武器", "auto"),
+        (None, "KindEnum", None, "ARMOR", "防具", "auto"),
+        (None, "RaceEnum", "种族", "HUMAN", "人类", "auto"),
+    ]
+    write_table(table_dir / "枚举.xlsx", { "test_enum": enums })
+    write_table(table_dir / "物品.xlsx", {
+        "item": [("!var", "*id", "kind"), ("!type", "int", "KindEnum"), (None, 1, "武器"), (None, 2, "防具")],
+        "shop": [("!var", "*id", "price"), ("!type", "int", "int"), (None, 1, 100)],
+    })
+    write_table(table_dir / "角色.xlsx", {
+        "npc": [("!var", "*id", "race"), ("!type", "int", "RaceEnum"), (None, 1, "人类")],
+    })
+
+    data_dir = tmp_path / "data"
+    _export(table_dir, data_dir, "py", is_inc=True)
+
+    enums[2] = (None, "KindEnum", None, "SHIELD", "防具", "auto")
+    write_table(table_dir / "枚举.xlsx", { "test_enum": enums })
+    recorder = _ParseRecorder()
+    _export(table_dir, data_dir, "py", is_inc=True, hooks=[recorder])
+
+    assert [title for title in recorder.titles if not title.endswith("_enum")] == ["item"]
+
+    fresh = tmp_path / "fresh"
+    _export(table_dir, fresh, "py")
+    assert _read(data_dir, "py") == _read(fresh, "py")
+    assert b"SHIELD" in (data_dir / "config" / "item.py").read_bytes()
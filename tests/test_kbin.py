@@ -0,0 +1,83 @@
+""" kbin 写入与读取回归测试
+"""
+
+from pathlib import Path
+import json
+
+from konfi import Exportor, kbin
+
+
+DESIGN_DIR = Path(__file__).resolve().parent.parent / "design"
+
+
+def _export(table_dir: Path, data_dir: Path, ext: str):
+    Exportor(table_dir=str(table_dir), data_dir=str(data_dir), writer_ext=ext, enum_tables={"枚举"}).run()
+
+def _as_json(val):
+    """ 按 json 写入器的规则转换 kbin 读出的值: 字典键转为字符串, 集合转为 { 值: true }
+    """
+    if isinstance(val, dict):
+        return { str(k): _as_json(v) for k, v in val.items() }
+    if isinstance(val, (set, frozenset)):
+        return { str(v): True for v in val }
+    if isinstance(val, (list, tuple)):
+        return [_as_json(v) for v in val]
+    return val
+
+
+def test_round_trip(tmp_path: Path):
+    """ kbin 中按主键、按行读出的数据与 json 导出一致
+    """
+    _export(DESIGN_DIR, tmp_path / "kbin", "kbin")
+    _export(DESIGN_DIR, tmp_path / "json", "json")
+
+    paths = sorted((tmp_path / "kbin").rglob("*.kbin"))
+    assert paths
+    for path in paths:
+        expected = json.loads((tmp_path / "json" / path.relative_to(tmp_path / "kbin")).with_suffix(".json").read_text("utf-8"))
+        with kbin.load(path) as sheet:
+            if not sheet.primary:
+                assert _as_json(sheet.value) == expected
+                continue
+
+            rows = list(sheet.rows())
+            assert len(rows) == len(sheet) == len(expected)
+            for row in rows:
+                key = row[sheet.primary[0]]
+                assert sheet.get(key) == row
+                assert _as_json(row) == expected[str(key)]
+            assert sheet.get(-1) is None
+
+
+def test_find(write_table, tmp_path: Path):
+    """ 按二级索引查找的行与 json 导出的索引一致, 只给出部分索引列时返回其下所有行
+    """
+    table_dir = tmp_path / "design"
+    write_table(table_dir / "枚举.xlsx", { "test_enum": [
+        ("!var", "enum_cls", "enum_cls_alias", "enum_name", "enum_alias", "enum_val"),
+        (None, "KindEnum", "类别", "WEAPON", "武器", "auto"),
+        (None, "KindEnum", None, "ARMOR", "防具", "auto"),
+    ]})
+    write_table(table_dir / "物品.xlsx", { "item": [
+        ("!var", "*id", "name", "kind", "level"),
+        ("!type", "int", "string", "KindEnum", "int?"),
+        ("!index", None, None, "by_kind_level", "by_kind_level"),
+        (None, 1, "剑", "武器", 1),
+        (None, 2, "盾", "防具", 1),
+        (None, 3, "斧", "武器", 2),
+        (None, 4, "弓", "武器", 1),
+        (None, 5, "锤", "武器", None),
+    ]})
+    _export(table_dir, tmp_path / "kbin", "kbin")
+    _export(table_dir, tmp_path / "json", "json")
+
+    index = json.loads((tmp_path / "json" / "config" / "item_index.json").read_text("utf-8"))["by_kind_level"]
+    with kbin.load(tmp_path / "kbin" / "config" / "item.kbin") as sheet:
+        for kind, levels in index.items():
+            for level, ids in levels.items():
+                assert [row["id"] for row in sheet.find("by_kind_level", int(kind), int(level))] == ids
+
+        assert [row["id"] for row in sheet.find("by_kind_level", 0, 1)] == [1, 4]
+        assert [row["id"] for row in sheet.find("by_kind_level", 0)] == [1, 4, 3]
+        assert sheet.find("by_kind_level", 1, 2) == []
+        assert sheet.find("by_kind_level", 0, 1)[0] == sheet.get(1)
@@ -0,0 +1,70 @@
+""" 解析器回归测试
+"""
+
+from pathlib import Path
+import json
+
+import pytest
+
+from konfi import Exportor
+
+
+def _export(table_dir: Path, data_dir: Path, ext: str="json"):
+    Exportor(table_dir=str(table_dir), data_dir=str(data_dir), writer_ext=ext, enum_tables={"枚举"}).run()
+
+
+def test_index(write_table, tmp_path: Path):
+    """ !index 行声明的索引: 重复的索引值对应多个主键, 同名的列组成多列索引, 空值不进入索引
+    """
+    table_dir = tmp_path / "design"
+    write_table(table_dir / "枚举.xlsx", { "test_enum": [
+        ("!var", "enum_cls", "enum_cls_alias", "enum_name", "enum_alias", "enum_val"),
+        (None, "KindEnum", "类别", "WEAPON", "武器", "auto"),
+        (None, "KindEnum", None, "ARMOR", "防具", "auto"),
+    ]})
+    write_table(table_dir / "物品.xlsx", { "item": [
+        ("!var", "*id", "name", "kind", "level"),
+        ("!type", "int", "string", "KindEnum", "int?"),
+        ("!index", None, "by_name", "by_kind_level", "by_kind_level"),
+        (None, 1, "剑", "武器", 1),
+        (None, 2, "盾", "防具", 1),
+        (None, 3, "剑", "武器", 2),
+        ("#", 9, "剑", "武器", 1),
+        (None, 4, "弓", "武器", 1),
+        (None, 5, "剑", "防具", None),
+    ]})
+    data_dir = tmp_path / "data"
+    _export(table_dir, data_dir)
+
+    index = json.loads((data_dir / "config" / "item_index.json").read_text("utf-8"))
+    assert index == {
+        "by_name": { "剑": [1, 3, 5], "盾": [2], "弓": [4] },
+        "by_kind_level": {
+            "0": { "1": [1, 4], "2": [3] },
+            "1": { "1": [2] },
+        },
+    }
+
+
+def test_batch_convert_errors(write_table, tmp_path: Path):
+    """ 整列转换时所有无法转换的单元格在同一个错误中报告, 行号与表格一致
+    """
+    table_dir = tmp_path / "design"
+    write_table(table_dir / "测试.xlsx", { "item": [
+        ("!var", "*id", "count", "rate", "enabled"),
+        ("!type", "int", "int", "float", "bool"),
+        (None, 1, 10, 0.5, "是"),
+        (None, 2, "十", 0.5, "是"),
+        (None, 3, 30, "half", "是"),
+        (None, 4, 40, 0.5, "maybe"),
+        (None, 5, "x", 0.5, "是"),
+    ]})
+
+    with pytest.raises(Exception) as exc_info:
+        _export(table_dir, tmp_path / "data")
+
+    message = str(exc_info.value)
+    assert "item" in message
+    for cell in ["第 4 行 count: '十'", "第 5 行 rate: 'half'", "第 6 行 enabled: 'maybe'", "第 7 行 count: 'x'"]:
+        assert cell in message
+    assert "第 3 行" not in message
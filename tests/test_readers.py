@@ -0,0 +1,59 @@
+""" 读取器回归测试
+"""
+
+from pathlib import Path
+import re
+import zipfile
+
+import openpyxl as xl
+import pytest
+
+from konfi.readers import Reader
+
+
+READERS = ["xlsx", "stream"]
+
+
+def _set_dimension(path: Path, ref: str):
+    """ 改写第一个 sheet 的 <dimension>, 模拟其他工具生成的过期尺寸
+    """
+    data = {}
+    with zipfile.ZipFile(path) as z:
+        for info in z.infolist():
+            data[info] = z.read(info.filename)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for info, content in data.items():
+            if info.filename == "xl/worksheets/sheet1.xml":
+                content = re.sub(rb'<dimension ref="[^"]+"\s*/>', f'<dimension ref="{ref}"/>'.encode(), content)
+            z.writestr(info, content)
+
+
+@pytest.fixture
+def stale_table(tmp_path: Path) -> Path:
+    wb = xl.Workbook()
+    ws = wb.active
+    ws.title = "test"
+    for r in range(1, 11):
+        ws.append([r, f"v{r}", r * 2])
+    ws.cell(1002, 1, 1002)
+    ws.cell(1002, 5, "wide")
+
+    path = tmp_path / "stale.xlsx"
+    wb.save(path)
+    _set_dimension(path, "A1:C5")
+    return path
+
+
+@pytest.mark.parametrize("name", READERS)
+def test_stale_dimension(name: str, stale_table: Path):
+    """ <dimension> 过期时不丢失范围外的行与单元格, 行号与 openpyxl 完整加载一致
+    """
+    rows = [row for ws in Reader.get_reader(name).read(stale_table) for row in ws.iter_rows(values_only=True)]
+    expected = [row for ws in Reader.get_reader("openpyxl").read(stale_table) for row in ws.iter_rows(values_only=True)]
+
+    assert len(rows) == len(expected) == 1002
+    assert rows[4][:3] == (5, "v5", 10)
+    assert rows[9][:3] == (10, "v10", 20)
+    assert rows[1001][0] == 1002 and rows[1001][4] == "wide"
+    assert all(not any(row) for row in rows[10:1001])
@@ -0,0 +1,77 @@
+""" 写入器回归测试
+"""
+
+from pathlib import Path
+import multiprocessing
+
+import pytest
+
+from konfi import Exportor
+from konfi.writers import Writer, LuaWriter
+from konfi.writers import writer as writer_module
+
+
+DESIGN_DIR = Path(__file__).resolve().parent.parent / "design"
+
+
+def _read(data_dir: Path, ext: str) -> dict[str, bytes]:
+    return {
+        p.relative_to(data_dir).as_posix(): p.read_bytes()
+        for p in data_dir.rglob(f"*.{ext}") if ".konfi" not in p.parts
+    }
+
+def _export(data_dir: Path, ext: str, workers: int, **options) -> dict[str, bytes]:
+    Exportor(table_dir=str(DESIGN_DIR), data_dir=str(data_dir), writer_ext=ext, writer_options=options, enum_tables={"枚举"}, workers=workers).run()
+    return _read(data_dir, ext)
+
+
+@pytest.mark.parametrize("ext, option, value", [
+    ("lua", "compact", True),
+    ("json", "indent", None),
+    ("py", "line_length", 10),
+])
+def test_spawn_workers_keep_options(ext: str, option: str, value, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """ spawn 启动的子进程重新导入模块, 输出仍与单进程一致, 写入器选项不回到默认值
+    """
+    monkeypatch.setattr(writer_module, "_mp_context", lambda: multiprocessing.get_context("spawn"))
+
+    default = _export(tmp_path / "default", ext, 1)
+    serial = _export(tmp_path / "serial", ext, 1, **{ option: value })
+    spawned = _export(tmp_path / "spawn", ext, 3, **{ option: value })
+
+    assert serial and spawned == serial
+    assert serial != default
+
+
+def test_targets_with_options(tmp_path: Path):
+    """ 同一格式的多个导出目标使用各自的写入器与选项
+    """
+    client, debug = tmp_path / "client", tmp_path / "debug"
+    Exportor(
+        table_dir=str(DESIGN_DIR),
+        enum_tables={"枚举"},
+        targets=[("lua", str(client), { "compact": True }), (LuaWriter(), str(debug))],
+    ).run()
+
+    assert _read(client, "lua") == _export(tmp_path / "compact", "lua", 1, compact=True)
+    assert _read(debug, "lua") == _export(tmp_path / "readable", "lua", 1)
+    assert _read(client, "lua") != _read(debug, "lua")
+
+
+def test_unknown_option():
+    with pytest.raises(ValueError):
+        Writer.create("json", compact=True)
+
+
+def test_lua_string_table_header(tmp_path: Path):
+    """ 只有引用了共享字符串表的 lua 文件才声明 local S = strings
+    """
+    files = _export(tmp_path / "data", "lua", 1, string_table=True)
+    with_strings = [name for name, data in files.items() if b"S[" in data]
+    without_strings = [name for name, data in files.items() if b"S[" not in data and name != "strings.lua"]
+
+    assert with_strings and without_strings
+    for name in with_strings:
+        assert b"local S = strings\n" in files[name]
+    for name in without_strings:
+        assert b"local S = strings" not in files[name]